@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+
+"""Inserting blocks one by one versus in bulk.
+
+Takes all the blocks of the default world and inserts them into an empty
+`ChunkStore`, first one `__setitem__` per block (as `Model.add_block` does),
+then with a single `set_many` call (as `Model.add_blocks` does). Also times
+the whole world generation, which uses the bulk API.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_bulk.py
+"""
+
+import time
+
+import numpy
+
+from common import generate
+from game.blocks import BLOCKS
+from game.world import ChunkStore
+
+
+def main():
+    start = time.perf_counter()
+    world = generate(seed=0)
+    generation = time.perf_counter() - start
+
+    arrays = [world.arrays(sector) for sector in world.chunks]
+    positions = numpy.concatenate([positions for positions, _ in arrays])
+    ids = numpy.concatenate([ids for _, ids in arrays])
+    print('blocks:          {:>10,}'.format(len(ids)))
+    print('generation:      {:>10.1f} ms'.format(1000 * generation))
+
+    store = ChunkStore()
+    items = [(tuple(position), BLOCKS[block_id]) for position, block_id in zip(positions.tolist(), ids.tolist())]
+    start = time.perf_counter()
+    for position, block in items:
+        store[position] = block
+    one_by_one = time.perf_counter() - start
+    print('one by one:      {:>10.1f} ms'.format(1000 * one_by_one))
+
+    store = ChunkStore()
+    start = time.perf_counter()
+    store.set_many(positions, ids)
+    bulk = time.perf_counter() - start
+    print('bulk:            {:>10.1f} ms ({:.0f}x faster)'.format(1000 * bulk, one_by_one / bulk))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+"""Player collisions.
+
+Simulates the player physics of `GameScene._update` with the previous
+collision test (8 sub-steps per frame, each testing the blocks around the
+player) and with the swept box of `game.collision` (a single step per
+frame), and reports the time per frame and where the player ends up:
+standing still, walking into a hill, and falling at terminal velocity
+onto a floor one block thick.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_collision.py
+"""
+
+import time
+
+import common
+from game.blocks import FACES, DIRT
+from game.collision import player_box, sweep
+from game.config import GRAVITY, PLAYER_HEIGHT, TERMINAL_VELOCITY, WALKING_SPEED
+from game.utilities import normalize
+from game.world import ChunkStore
+
+
+class Player:
+    def __init__(self, world, position):
+        self.world = world
+        self.position = position
+        self.dy = 0
+
+    def move(self, dt, motion):
+        """Apply the walking `motion` and the gravity during `dt`."""
+        self.dy = max(self.dy - dt * GRAVITY, -TERMINAL_VELOCITY)
+        dx, dy, dz = (m * dt * WALKING_SPEED for m in motion)
+        self.position = self.collide((dx, dy + self.dy * dt, dz))
+
+
+class StepPlayer(Player):
+    """The collision test previously used by `GameScene.collide`."""
+    steps = 8
+
+    def collide(self, motion):
+        pad = 0.25
+        p = [a + b for a, b in zip(self.position, motion)]
+        np = normalize(p)
+        for face in FACES:
+            for i in range(3):
+                if not face[i]:
+                    continue
+                d = (p[i] - np[i]) * face[i]
+                if d < pad:
+                    continue
+                for dy in range(PLAYER_HEIGHT):
+                    op = list(np)
+                    op[1] -= dy
+                    op[i] += face[i]
+                    if tuple(op) not in self.world:
+                        continue
+                    p[i] -= (d - pad) * face[i]
+                    if face == (0, -1, 0) or face == (0, 1, 0):
+                        self.dy = 0
+                    break
+        return tuple(p)
+
+
+class SweepPlayer(Player):
+    steps = 1
+
+    def collide(self, motion):
+        low, high = player_box(self.position, PLAYER_HEIGHT)
+        motion, blocked = sweep(self.world, low, high, motion)
+        if blocked[1]:
+            self.dy = 0
+        return tuple(p + d for p, d in zip(self.position, motion))
+
+
+def simulate(cls, world, position, motion, frames, dt):
+    player = cls(world, position)
+    start = time.perf_counter()
+    for _ in range(frames):
+        for _ in range(cls.steps):
+            player.move(dt / cls.steps, motion)
+    return player.position, (time.perf_counter() - start) / frames
+
+
+def compare(title, world, position, motion, frames=600, dt=1 / 60):
+    print(title)
+    for cls in (StepPlayer, SweepPlayer):
+        (x, y, z), elapsed = simulate(cls, world, position, motion, frames, dt)
+        print('  {:12} {:6.1f} us/frame, ends at ({:.2f}, {:.2f}, {:.2f})'.format(
+            cls.__name__, 1e6 * elapsed, x, y, z))
+
+
+def main():
+    world = common.generate()
+    ground = world.highest(0, 0) + PLAYER_HEIGHT - 0.25
+    compare('standing still:', world, (0, ground, 0), (0, 0, 0))
+    compare('walking into a hill:', world, (0, ground, 0), (0.6, 0, 0.8))
+
+    floor = ChunkStore()
+    floor.fill((-8, 0, -8), (8, 0, 8), DIRT.id)
+    compare('falling onto a thin floor, at 5 frames per second:', floor, (0, 40, 0), (0, 0, 0),
+            frames=30, dt=0.2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+
+"""Sector frustum culling.
+
+First checks the culling math against known camera poses, then reports
+the share of the sectors around the player which are actually drawn, and
+the time taken to cull them, while turning around.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_frustum.py
+"""
+
+import time
+
+import common  # noqa: F401, sets up the import path
+from game.frustum import visible_sectors
+
+ASPECT = 800 / 600
+
+# (position, rotation, sectors expected visible, sectors expected culled)
+POSES = [
+    # Looking towards -z, the default orientation:
+    ((8, 0, 8), (0, 0), [(0, 0, 0), (0, 0, -1), (0, 0, -4)], [(0, 0, 2), (0, 0, -5), (4, 0, 0)]),
+    # Looking towards +x:
+    ((8, 0, 8), (90, 0), [(0, 0, 0), (3, 0, 0)], [(-2, 0, 0), (0, 0, 3)]),
+    # Looking towards +z, from another sector:
+    ((-24, 5, -40), (180, 0), [(-2, 0, -3), (-2, 0, 0)], [(-2, 0, -5), (2, 0, -3)]),
+    # Looking straight down: only the nearby columns are seen.
+    ((8, 0, 8), (0, -90), [(0, 0, 0), (1, 0, 0), (0, 0, -1)], [(3, 0, 0), (0, 0, 3)]),
+]
+
+
+def check_poses():
+    for position, rotation, visible, culled in POSES:
+        result = visible_sectors(visible + culled, position, rotation, ASPECT)
+        assert result == visible, 'Wrong culling at {} {}: {}'.format(position, rotation, result)
+    print('culling checked against {} camera poses'.format(len(POSES)))
+
+
+def main():
+    check_poses()
+    pad = 4
+    sectors = [(dx, 0, dz) for dx in range(-pad, pad + 1) for dz in range(-pad, pad + 1)
+               if dx ** 2 + dz ** 2 <= (pad + 1) ** 2]
+    drawn = 0
+    steps = 360
+    start = time.perf_counter()
+    for angle in range(steps):
+        drawn += len(visible_sectors(sectors, (8, 1, 8), (angle, -10), ASPECT))
+    elapsed = time.perf_counter() - start
+    print('sectors around the player: {}'.format(len(sectors)))
+    print('drawn on average:          {:.1f} ({:.0%})'.format(drawn / steps, drawn / steps / len(sectors)))
+    print('culling time:              {:.3f} ms/frame'.format(1000 * elapsed / steps))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+
+"""Terrain generation throughput, in chunks per second.
+
+Generates a square of chunks around the origin with each of the terrain
+generators, and reports how many chunks each one builds per second. Only
+`generate_chunk` is timed, storing the chunks is measured by bench_bulk.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_genworld.py [radius]
+"""
+
+import sys
+import time
+
+import common  # noqa: F401, sets up the import path
+from game.genworld import GENERATORS
+
+
+def main(radius=8):
+    sectors = [(x, 0, z) for x in range(-radius, radius) for z in range(-radius, radius)]
+    print('chunks:          {:>10,}'.format(len(sectors)))
+    for name, generator_class in sorted(GENERATORS.items()):
+        generator = generator_class(seed=0)
+        start = time.perf_counter()
+        for sector in sectors:
+            generator.generate_chunk(sector)
+        duration = time.perf_counter() - start
+        print('{:<16} {:>10,.0f} chunks/s ({:.2f} ms/chunk)'.format(
+            name + ':', len(sectors) / duration, 1000 * duration / len(sectors)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+"""Generating, editing, saving and loading a world without a window.
+
+Uses `Model` and `SaveManager` alone, as a server or a tool would: generates
+a square of chunks, builds on it, saves it to a temporary directory, then
+loads it into another `Model` and checks that the blocks are the same.
+Reports the time of each step, and checks that pyglet was never imported.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_headless.py [radius]
+"""
+
+import sys
+import tempfile
+import time
+
+start = time.perf_counter()
+import common  # noqa: F401, sets up the import path
+from game.blocks import BRICK
+from game.genworld import create_generator
+from game.model import Model
+from game.savemanager import SaveManager
+import_time = time.perf_counter() - start
+
+
+def timed(title, func):
+    start = time.perf_counter()
+    result = func()
+    print('{:28} {:8.1f} ms'.format(title, 1000 * (time.perf_counter() - start)))
+    return result
+
+
+def build(model, radius):
+    """Build a brick wall across the generated terrain."""
+    for x in range(-16 * radius, 16 * radius):
+        top = model.world.highest(x, 0)
+        model.fill_region((x, top + 1, 0), (x, top + 4, 0), BRICK.id)
+
+
+def main():
+    radius = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sectors = [(x, 0, z) for x in range(-radius, radius) for z in range(-radius, radius)]
+    print('{:28} {:8.1f} ms'.format('imports', 1000 * import_time))
+
+    model = Model()
+    model.generator = create_generator('noise', seed=1)
+    timed('generate {} chunks'.format(len(sectors)), lambda: model.load_chunks(sectors))
+    timed('build a wall', lambda: build(model, radius))
+
+    with tempfile.TemporaryDirectory() as directory:
+        save = SaveManager(save_path=directory)
+        save.save_slot = 1
+        save.timestamp_print = lambda text: None
+
+        def save_world():
+            save.save_world(model)
+            while save.saving:
+                time.sleep(0.001)
+                save.poll()
+        timed('save', save_world)
+
+        loaded = Model()
+        timed('load', lambda: save.load_world(loaded))
+        timed('load the chunks', lambda: loaded.load_chunks(sectors))
+        for sector in sectors:
+            assert (loaded.world.chunk_ids(sector) == model.world.chunk_ids(sector)).all()
+        for each in (model, loaded):
+            each.region and each.region.close()
+            each.close()
+        save.close()
+
+    assert 'pyglet' not in sys.modules, 'pyglet was imported'
+    print('same blocks after loading, and pyglet was never imported')
+
+
+if __name__ == '__main__':
+    main()
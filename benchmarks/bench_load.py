@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+"""Time to first frame when loading a large save.
+
+Writes a region file with a large square of modified chunks, then times
+how long the game waits before it can draw the first frame:
+
+- loading every chunk of the file up front,
+- streaming: only the chunks around the player are read before the first
+  frame, as `Model` does, the others are read as the player approaches.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_load.py [radius]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401, sets up the import path
+from game.config import RENDER_DISTANCE
+from game.genworld import NoiseGenerator
+from game.region import RegionFile, write_region
+from game.world import ChunkStore, compress_chunk, decompress_chunk
+
+
+def load(path, sectors=None):
+    """Read the chunks of `sectors` (all of them by default) into a new
+    ChunkStore, and return how long it took."""
+    start = time.perf_counter()
+    world = ChunkStore()
+    with RegionFile(path) as region:
+        for sector in region if sectors is None else sectors:
+            if sector in region:
+                world.set_chunk(sector, decompress_chunk(region.read(sector)))
+    return time.perf_counter() - start
+
+
+def main(radius=30):
+    generator = NoiseGenerator(seed=0)
+    sectors = [(x, 0, z) for x in range(-radius, radius) for z in range(-radius, radius)]
+    chunks = {sector: compress_chunk(generator.generate_chunk(sector)) for sector in sectors}
+    # The chunks needed around the player, as in Model.change_sectors:
+    distance = RENDER_DISTANCE + 1
+    around = [(x, 0, z) for x in range(-distance, distance + 1) for z in range(-distance, distance + 1)
+              if x ** 2 + z ** 2 <= (distance + 1) ** 2]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'world.region')
+        write_region(path, chunks, {'generator': 'noise', 'seed': 0})
+        print('save:            {:>10,} chunks, {:,} bytes'.format(len(chunks), os.path.getsize(path)))
+        everything = load(path)
+        streaming = load(path, around)
+        print('load everything: {:>10.1f} ms'.format(1000 * everything))
+        print('streaming:       {:>10.1f} ms ({} chunks around the player, {:.0f}x faster)'.format(
+            1000 * streaming, len(around), everything / streaming))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+
+"""Geometry produced by the sector mesher.
+
+Meshes every sector of the default world and compares the number of
+vertices uploaded when drawing whole exposed cubes, only the visible
+faces, and the visible faces merged by greedy meshing.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_mesher.py
+"""
+
+import time
+
+from common import generate
+from game.mesher import build_sector_mesh, exposed_mask, padded_ids
+
+
+def mesh_world(world, greedy):
+    """Mesh all sectors, return the number of vertices and the time taken."""
+    count = 0
+    start = time.perf_counter()
+    for sector in world.chunks:
+        for _, vertices, _ in build_sector_mesh(world, sector, greedy):
+            count += len(vertices) // 3
+    return count, time.perf_counter() - start
+
+
+def main():
+    world = generate(seed=0)
+    sectors = len(world.chunks)
+    cube_vertices = 0
+    for sector in world.chunks:
+        cube_vertices += int(exposed_mask(padded_ids(world, sector)).sum()) * 24
+
+    # 3 floats of position and 2 of texture coordinates per vertex:
+    vertex_bytes = 5 * 4
+    print('sectors: {}'.format(sectors))
+    print('{:<16} {:>10,} vertices {:>12,} bytes'.format(
+        'exposed cubes', cube_vertices, cube_vertices * vertex_bytes))
+    for name, greedy in (('visible faces', False), ('greedy meshing', True)):
+        count, elapsed = mesh_world(world, greedy)
+        print('{:<16} {:>10,} vertices {:>12,} bytes {:>6.1f}x less {:>6.1f} ms/sector'.format(
+            name, count, count * vertex_bytes, cube_vertices / count, 1000 * elapsed / sectors))
+
+
+if __name__ == '__main__':
+    main()
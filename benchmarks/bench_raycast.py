@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+"""Line of sight search (`Model.hit_test`).
+
+Casts random rays from the player's eye height over the default world,
+first from random places then all from a single place, and compares the
+previous fixed step search (8 samples per block) with the grid traversal of
+`game.raycast`, one ray at a time and all rays at once. Also counts the rays
+where the fixed step search missed the first block crossed, by clipping a
+corner between two samples.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_raycast.py
+"""
+
+import time
+
+import numpy
+
+import common
+from game.config import NODE_SELECTOR, PLAYER_HEIGHT
+from game.raycast import raycast, raycast_many
+from game.utilities import normalize
+
+RAYS = 2000
+
+
+def step_hit_test(world, position, vector, max_distance=NODE_SELECTOR):
+    """The fixed step search previously used by `Model.hit_test`."""
+    m = 8
+    x, y, z = position
+    dx, dy, dz = vector
+    previous = None
+    for _ in range(max_distance * m):
+        checked_position = normalize((x, y, z))
+        if checked_position != previous and checked_position in world:
+            return checked_position, previous
+        previous = checked_position
+        x, y, z = x + dx / m, y + dy / m, z + dz / m
+    return None, None
+
+
+def make_rays(world, count, seed=0):
+    """Return random rays starting at eye height above the ground."""
+    rng = numpy.random.default_rng(seed)
+    positions = []
+    while len(positions) < count:
+        x, z = rng.uniform(-60, 60, 2)
+        ground = world.highest(int(round(x)), int(round(z)))
+        if ground is not None:
+            positions.append((x, ground + PLAYER_HEIGHT - 0.5, z))
+    vectors = rng.normal(size=(count, 3))
+    vectors /= numpy.linalg.norm(vectors, axis=1, keepdims=True)
+    return numpy.array(positions), vectors
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def compare(world, title, positions, vectors):
+    rays = list(zip(map(tuple, positions.tolist()), map(tuple, vectors.tolist())))
+
+    stepped, step_time = timed(lambda: [step_hit_test(world, p, v) for p, v in rays])
+    traversed, traversal_time = timed(lambda: [raycast(world, p, v) for p, v in rays])
+    (hit, blocks, faces), batch_time = timed(lambda: raycast_many(world, positions, vectors))
+
+    for (block, face), row_hit, row_block, row_face in zip(traversed, hit, blocks.tolist(), faces.tolist()):
+        assert (block is not None) == row_hit
+        if row_hit:
+            assert block == tuple(row_block) and (face or (0, 0, 0)) == tuple(row_face)
+    missed = sum(step[0] != exact[0] for step, exact in zip(stepped, traversed))
+
+    print(title)
+    print('  rays:                  {} ({} hit)'.format(len(rays), int(hit.sum())))
+    print('  fixed step:            {:.1f} us/ray'.format(1e6 * step_time / len(rays)))
+    print('  grid traversal:        {:.1f} us/ray'.format(1e6 * traversal_time / len(rays)))
+    print('  grid traversal, batch: {:.1f} us/ray'.format(1e6 * batch_time / len(rays)))
+    print('  fixed step disagrees:  {} rays'.format(missed))
+
+
+def main():
+    world = common.generate()
+    positions, vectors = make_rays(world, RAYS)
+    compare(world, 'rays from random places:', positions, vectors)
+    # All the rays from a single place, as for an explosion:
+    positions[:] = positions[0]
+    compare(world, 'rays from a single place:', positions, vectors)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+"""Region files versus pickle, for saving and loading worlds.
+
+Saves the default world (every chunk, as if the player had modified all
+of them) with the former pickle formats and with a region file, then
+loads it back, and compares the file sizes. Also times reading a single
+chunk, which only the region file can do without loading everything,
+and saving a single modified chunk, appended to the existing file.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_region.py
+"""
+
+import os
+import pickle
+import tempfile
+import time
+
+from common import generate
+from game.region import RegionFile, write_region
+from game.world import ChunkStore, compress_chunk, decompress_chunk
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def save_pickle(path, world):
+    with open(path, 'wb') as file:
+        pickle.dump(world, file)
+
+
+def load_pickle(path):
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def save_region(path, world):
+    chunks = {sector: compress_chunk(world.chunk_ids(sector)) for sector in world.chunks}
+    write_region(path, chunks, {'generator': 'hills', 'seed': 0})
+
+
+def load_region(path):
+    world = ChunkStore()
+    with RegionFile(path) as region:
+        for sector in region:
+            world.set_chunk(sector, decompress_chunk(region.read(sector)))
+    return world
+
+
+def append_one_chunk(path, sector, world):
+    with RegionFile(path, writable=True) as region:
+        region.append({sector: compress_chunk(world.chunk_ids(sector))}, region.metadata)
+
+
+def read_one_chunk(path, sector):
+    with RegionFile(path) as region:
+        return decompress_chunk(region.read(sector))
+
+
+def main():
+    world = generate(seed=0)
+    print('blocks: {:,}, chunks: {:,}'.format(len(world), len(world.chunks)))
+    print('{:<16} {:>12} {:>10} {:>10}'.format('', 'size', 'save', 'load'))
+    with tempfile.TemporaryDirectory() as directory:
+        formats = [
+            ('pickle (dict)', save_pickle, load_pickle, dict(world.items())),
+            ('pickle (chunks)', save_pickle, load_pickle, world),
+            ('region file', save_region, load_region, world),
+        ]
+        for name, save, load, data in formats:
+            path = os.path.join(directory, name)
+            _, save_time = timed(save, path, data)
+            loaded, load_time = timed(load, path)
+            assert len(loaded) == len(world)
+            print('{:<16} {:>10,} B {:>7.1f} ms {:>7.1f} ms'.format(
+                name, os.path.getsize(path), 1000 * save_time, 1000 * load_time))
+
+        sector = next(iter(world.chunks))
+        ids, read_time = timed(read_one_chunk, os.path.join(directory, 'region file'), sector)
+        assert (ids == world.chunk_ids(sector)).all()
+        print('reading a single chunk from the region file: {:.2f} ms'.format(1000 * read_time))
+        _, append_time = timed(append_one_chunk, os.path.join(directory, 'region file'), sector, world)
+        print('saving a single chunk to the region file:    {:.2f} ms'.format(1000 * append_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+
+"""Memory used per block by the world storage.
+
+Generates the default world into a `ChunkStore`, copies it into a plain
+dict (the historical `Model.world`), and reports the Python heap used by
+each.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_storage.py
+"""
+
+import tracemalloc
+
+from common import generate
+
+
+def main():
+    # Warm up, so that lazy imports are not counted.
+    generate(seed=0)
+    tracemalloc.start()
+    world = generate(seed=0)
+    store_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    legacy = {position: block for position, block in world.items()}
+    dict_size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    for name, size in (('dict', dict_size), ('ChunkStore', store_size)):
+        print('{:<12} {:>8} blocks {:>12,} bytes {:>8.1f} bytes/block'.format(
+            name, len(legacy), size, size / len(legacy)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+
+"""Chunk generation throughput with 1 to N worker processes.
+
+Generates a square of chunks with the noise generator through a
+`ProcessPoolExecutor`, as `Model` does, and reports the chunks per second
+for each number of workers, up to the number of cores (or the first
+argument). Starting the workers is not timed: the pool is warmed up first.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_workers.py [max_workers] [radius]
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import common  # noqa: F401, sets up the import path
+from game.genworld import generate_chunk
+
+
+def main(max_workers=os.cpu_count(), radius=12, name='noise', seed=0):
+    sectors = [(x, z) for x in range(-radius, radius) for z in range(-radius, radius)]
+    print('chunks:          {:>10,}'.format(len(sectors)))
+    print('cores:           {:>10}'.format(os.cpu_count()))
+    context = multiprocessing.get_context('spawn')
+    single = None
+    for workers in range(1, max_workers + 1):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            # Start all the workers, and create their generator.
+            list(executor.map(generate_chunk, [name] * workers, [seed] * workers,
+                              range(1000, 1000 + workers), [0] * workers))
+            start = time.perf_counter()
+            futures = [executor.submit(generate_chunk, name, seed, x, z) for x, z in sectors]
+            for future in futures:
+                future.result()
+            duration = time.perf_counter() - start
+        rate = len(sectors) / duration
+        single = single or rate
+        print('{:>2} workers:      {:>10,.0f} chunks/s ({:.1f}x)'.format(workers, rate, rate / single))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
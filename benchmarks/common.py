@@ -0,0 +1,35 @@
+"""Helpers shared by the benchmarks."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.genworld import HillsGenerator, generate_world
+from game.world import ChunkStore
+
+
+class Recorder:
+    """Minimal stand-in for `Model`, only storing the generated blocks."""
+
+    def __init__(self, world):
+        self.world = world
+
+    def add_block(self, position, block, immediate=True):
+        self.world[position] = block
+
+    def add_blocks(self, positions, ids):
+        self.world.set_many(positions, ids)
+
+    def fill_region(self, start, end, block_id):
+        self.world.fill(start, end, block_id)
+
+    def set_chunk(self, sector, ids):
+        self.world.set_chunk(sector, ids)
+
+
+def generate(seed=0):
+    """Generate the default world, and return its block storage."""
+    recorder = Recorder(ChunkStore())
+    generate_world(recorder, HillsGenerator(seed))
+    return recorder.world
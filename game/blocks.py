@@ -31,8 +31,14 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import numpy
 
-def _tex_coord(x, y, n=4):
+
+# The texture atlas is a grid of ATLAS_SIZE x ATLAS_SIZE tiles.
+ATLAS_SIZE = 4
+
+
+def _tex_coord(x, y, n=ATLAS_SIZE):
     """ Return the bounding vertices of the texture square.
 
     """
@@ -57,29 +63,108 @@ def _tex_coords(top, bottom, side):
 
 
 class Block:
-    __slots__ = ('name', 'tex_coords')
+    __slots__ = ('id', 'name', 'tex_coords', 'opaque', 'breakable')
 
-    def __init__(self, name, tex_coords):
+    def __init__(self, id, name, tex_coords, opaque=True, breakable=True):
         """A class for Blocks
 
+        :param id: A small integer identifying this material. It is stored
+                   in the world and in the save files, so it must never change.
         :param name: The name of the Block material.
         :param tex_coords: The texture coordinates for this material.
+        :param opaque: Whether or not the Block hides its neighbors' faces.
+        :param breakable: Whether or not the player can remove the Block.
         """
+        self.id = id
         self.name = name
         self.tex_coords = tex_coords
+        self.opaque = opaque
+        self.breakable = breakable
+        BLOCKS.register(self)
+
+    def __reduce__(self):
+        # Pickle Blocks by id, so that loading returns the registered instance.
+        return get_block, (self.id,)
+
+    def __repr__(self):
+        return '%s(%d, %r)' % (self.__class__.__name__, self.id, self.name)
 
 
-DIRT = Block('dirt', _tex_coords((0, 1), (0, 1), (0, 1)))
-DIRT_WITH_GRASS = Block('dirt_with_grass', _tex_coords((1, 0), (0, 1), (0, 0)))
-SAND = Block('sand', _tex_coords((1, 1), (1, 1), (1, 1)))
-COBBLESTONE = Block('cobblestone', _tex_coords((2, 0), (2, 0), (2, 0)))
-BRICK_COBBLESTONE = Block('brick_cobblestone', _tex_coords((3, 0), (3, 0), (3, 0)))
-BRICK = Block('brick', _tex_coords((3, 1), (3, 1), (3, 1)))
-BEDSTONE = Block('bedstone', _tex_coords((2, 1), (2, 1), (2, 1)))
-TREE = Block('tree', _tex_coords((1, 2), (1, 2), (0, 2)))
-LEAVES = Block('leaves', _tex_coords((2, 2), (2, 2), (2, 2)))
-SNOW = Block('snow', _tex_coords((1, 3), (0, 1), (0, 3)))
-WOODEN_PLANKS = Block('wooden_planks', _tex_coords((2, 3), (2, 3), (2, 3)))
+class BlockRegistry:
+    """Registry of all the Block materials, indexed by their numeric id.
+
+    Besides the Block instances, it holds per-id lookup tables as NumPy
+    arrays, so that code working on arrays of block ids (meshing, saving,
+    world generation) never has to go through the Python objects:
+
+    - `tex_coords`: float32 array of shape (n, 6, 8), the texture coordinates
+      of the 6 faces (in `FACES` order) of each Block.
+    - `tiles`: int array of shape (n, 6), the index of the atlas tile used by
+      each face, counted row by row from the bottom left of the atlas.
+    - `opaque`: bool array of shape (n,).
+    - `breakable`: bool array of shape (n,).
+
+    The id 0 is reserved for air (no block), its entry in the tables is empty.
+    """
+
+    def __init__(self):
+        self.blocks = [None]
+        self.by_name = {}
+        self.tex_coords = numpy.zeros((1, 6, 8), dtype=numpy.float32)
+        self.tiles = numpy.zeros((1, 6), dtype=numpy.intp)
+        self.opaque = numpy.zeros(1, dtype=bool)
+        self.breakable = numpy.zeros(1, dtype=bool)
+
+    def register(self, block):
+        """Add a Block to the registry, and update the lookup tables."""
+        assert block.id > 0, "The id 0 is reserved for air"
+        if block.id >= len(self.blocks):
+            grow = block.id + 1 - len(self.blocks)
+            self.blocks.extend([None] * grow)
+            self.tex_coords = numpy.concatenate(
+                (self.tex_coords, numpy.zeros((grow, 6, 8), dtype=numpy.float32)))
+            self.tiles = numpy.concatenate((self.tiles, numpy.zeros((grow, 6), dtype=numpy.intp)))
+            self.opaque = numpy.concatenate((self.opaque, numpy.zeros(grow, dtype=bool)))
+            self.breakable = numpy.concatenate((self.breakable, numpy.zeros(grow, dtype=bool)))
+        assert self.blocks[block.id] is None, "Block id already used: {}".format(block.id)
+        self.blocks[block.id] = block
+        self.by_name[block.name] = block
+        self.tex_coords[block.id] = numpy.reshape(block.tex_coords, (6, 8))
+        # The first texture coordinate of each face is the tile's bottom left.
+        column, row = numpy.rint(self.tex_coords[block.id, :, :2] * ATLAS_SIZE).astype(numpy.intp).T
+        self.tiles[block.id] = column + row * ATLAS_SIZE
+        self.opaque[block.id] = block.opaque
+        self.breakable[block.id] = block.breakable
+
+    def __getitem__(self, block_id):
+        block = self.blocks[block_id]
+        if block is None:
+            raise KeyError(block_id)
+        return block
+
+    def __len__(self):
+        return len(self.blocks)
+
+
+BLOCKS = BlockRegistry()
+
+
+def get_block(block_id):
+    """Return the registered Block with the given numeric id."""
+    return BLOCKS[block_id]
+
+
+DIRT = Block(1, 'dirt', _tex_coords((0, 1), (0, 1), (0, 1)))
+DIRT_WITH_GRASS = Block(2, 'dirt_with_grass', _tex_coords((1, 0), (0, 1), (0, 0)))
+SAND = Block(3, 'sand', _tex_coords((1, 1), (1, 1), (1, 1)))
+COBBLESTONE = Block(4, 'cobblestone', _tex_coords((2, 0), (2, 0), (2, 0)))
+BRICK_COBBLESTONE = Block(5, 'brick_cobblestone', _tex_coords((3, 0), (3, 0), (3, 0)))
+BRICK = Block(6, 'brick', _tex_coords((3, 1), (3, 1), (3, 1)))
+BEDSTONE = Block(7, 'bedstone', _tex_coords((2, 1), (2, 1), (2, 1)), breakable=False)
+TREE = Block(8, 'tree', _tex_coords((1, 2), (1, 2), (0, 2)))
+LEAVES = Block(9, 'leaves', _tex_coords((2, 2), (2, 2), (2, 2)))
+SNOW = Block(10, 'snow', _tex_coords((1, 3), (0, 1), (0, 3)))
+WOODEN_PLANKS = Block(11, 'wooden_planks', _tex_coords((2, 3), (2, 3), (2, 3)))
 
 # A reference to the 6 faces (sides) of the blocks:
 FACES = [(0, 1, 0), (0, -1, 0), (-1, 0, 0), (1, 0, 0), (0, 0, 1), (0, 0, -1)]
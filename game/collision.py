@@ -0,0 +1,107 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import math
+
+# Margin under which boxes just touching are not considered overlapping,
+# to absorb the rounding errors of the positions.
+EPSILON = 1e-6
+
+
+def player_box(position, height, pad=0.25):
+    """Return the bounding box of the player.
+
+    The player fills `height` blocks, from the one of its eyes downwards,
+    narrowed by `pad` on each side.
+
+    :param position: The (x, y, z) position of the eyes of the player.
+    :param height: int: The height of the player, in blocks.
+    :param pad: float: The margin between the player and the blocks around
+                it, when it stands at the center of a block.
+    :return: A tuple (low, high) of the (x, y, z) corners of the box.
+    """
+    x, y, z = position
+    half = 0.5 - pad
+    return (x - half, y - height + 1 - half, z - half), (x + half, y + half, z + half)
+
+
+def sweep(world, low, high, motion):
+    """Move a box through the world, stopping it at the first blocks met.
+
+    The motion is resolved one axis at a time (y, then x and z), each over
+    its whole length: the box never goes through a block, whatever its speed.
+    The blocks which may be met are looked up once, over the bounding box
+    of the whole motion.
+
+    :param world: The `ChunkStore` (or any container of block positions).
+    :param low: The (x, y, z) lowest corner of the box.
+    :param high: The (x, y, z) highest corner of the box.
+    :param motion: The (dx, dy, dz) motion of the box.
+    :return: A tuple (motion, blocked) of the allowed (dx, dy, dz) motion,
+             and of a tuple of 3 bools, True for the axes where a block was
+             met.
+    """
+    low = list(low)
+    high = list(high)
+    motion = list(motion)
+    # The block at (x, y, z) spans from x - 0.5 to x + 0.5 on each axis.
+    ranges = [range(math.floor(min(lo, lo + d) + 0.5), math.floor(max(hi, hi + d) + 0.5) + 1)
+              for lo, hi, d in zip(low, high, motion)]
+    blocks = [(x, y, z) for x in ranges[0] for y in ranges[1] for z in ranges[2] if (x, y, z) in world]
+
+    blocked = [False, False, False]
+    for axis in (1, 0, 2):
+        d = motion[axis]
+        if not d:
+            continue
+        others = [i for i in range(3) if i != axis]
+        for block in blocks:
+            # Only the blocks in the way of the box along this axis:
+            if any(high[i] <= block[i] - 0.5 + EPSILON or low[i] >= block[i] + 0.5 - EPSILON
+                   for i in others):
+                continue
+            if d > 0 and high[axis] <= block[axis] - 0.5 + EPSILON:
+                limit = block[axis] - 0.5 - high[axis]
+                if limit < d:
+                    d = max(limit, 0)
+                    blocked[axis] = True
+            elif d < 0 and low[axis] >= block[axis] + 0.5 - EPSILON:
+                limit = block[axis] + 0.5 - low[axis]
+                if limit > d:
+                    d = min(limit, 0)
+                    blocked[axis] = True
+        motion[axis] = d
+        low[axis] += d
+        high[axis] += d
+    return tuple(motion), tuple(blocked)
@@ -49,6 +49,10 @@ TOGGLE_GUI = True
 TOGGLE_INFO_LABEL = True
 
 # FPS
+FRAMES_PER_SEC = 60
+
+# Rate of the simulation (player motion and collisions), independent of the
+# frame rate: the camera is interpolated between the two last ticks.
 TICKS_PER_SEC = 60
 
 # Player
@@ -60,6 +64,11 @@ FLYING = False
 LOOK_SPEED_X = 0.15
 LOOK_SPEED_Y = 0.15
 
+# Camera projection
+FIELD_OF_VIEW = 65.0
+NEAR_PLANE = 0.1
+FAR_PLANE = 60.0
+
 # Fog range
 FOG_START = 20.0
 FOG_END = 60.0
@@ -67,6 +76,53 @@ FOG_END = 60.0
 # Size of sectors used to ease block loading.
 SECTOR_SIZE = 16
 
+# Number of sectors shown around the player. It can be changed in game.
+RENDER_DISTANCE = 4
+
+# Sectors are hidden once further than RENDER_DISTANCE + UNLOAD_MARGIN.
+UNLOAD_MARGIN = 2
+
+# The sectors around where the player will be after moving this many sectors
+# in the current direction are shown in advance.
+PREFETCH_DISTANCE = 2
+
+# Merge adjacent coplanar faces with the same texture into larger quads.
+# This uploads far less geometry for flat terrain, at the cost of a slower
+# meshing and of one texture per atlas tile.
+GREEDY_MESHING = False
+
+# Number of worker threads building the sector meshes in the background.
+MESH_WORKERS = 2
+
+# Time the main thread may spend per frame uploading the built meshes and
+# running the queued sector changes, in seconds. The rest waits for the next
+# frames.
+MESH_FRAME_BUDGET = 0.004
+
+# Number of worker processes generating the terrain of new chunks.
+GENERATION_WORKERS = 2
+
+# Interval between two automatic saves of the world, in seconds.
+AUTOSAVE_INTERVAL = 60
+
+# Maximum number of modified chunks kept compressed in memory once evicted,
+# until they are saved. The world is saved early once half of them are used.
+# Beyond it, e.g. when the world cannot be saved, the oldest ones are dropped
+# and generated again.
+MAX_EVICTED_CHUNKS = 1024
+
+# Interval between two writes of the block edits to the journal, in seconds.
+# The edits made since the last write are lost if the game crashes.
+JOURNAL_FLUSH_INTERVAL = 1.0
+
+# Width of the thumbnail stored in the saves and shown in the menu, in pixels.
+THUMBNAIL_WIDTH = 48
+
+# Vertical extent of the world. Blocks are stored in columns (chunks) of
+# SECTOR_SIZE x WORLD_HEIGHT x SECTOR_SIZE, starting at WORLD_BOTTOM.
+WORLD_BOTTOM = -16
+WORLD_HEIGHT = 64
+
 # Speed
 WALKING_SPEED = 3
 RUNNING_SPEED = 6
@@ -93,5 +149,11 @@ JUMP_SPEED = math.sqrt(2 * GRAVITY * MAX_JUMP_HEIGHT)
 # Terminal velocity
 TERMINAL_VELOCITY = 50
 
-# Generate Hills?
+# Terrain generator of new worlds: 'hills', 'flat' or 'noise'.
+WORLD_GENERATOR = 'noise'
+
+# Seed of new worlds. If None, a random seed is picked for each world.
+WORLD_SEED = None
+
+# Generate Hills? (for the 'hills' generator)
 HILLS_ON = True
@@ -0,0 +1,141 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+import numpy
+
+from .config import *
+
+
+def perspective_matrix(fovy, aspect, near, far):
+    """Return the projection matrix set by `gluPerspective`."""
+    f = 1.0 / math.tan(math.radians(fovy) / 2)
+    return numpy.array([[f / aspect, 0, 0, 0],
+                        [0, f, 0, 0],
+                        [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                        [0, 0, -1, 0]])
+
+
+def rotation_matrix(angle, x, y, z):
+    """Return the rotation matrix set by `glRotatef`."""
+    x, y, z = numpy.array((x, y, z), dtype=float) / math.sqrt(x * x + y * y + z * z)
+    c = math.cos(math.radians(angle))
+    s = math.sin(math.radians(angle))
+    t = 1 - c
+    return numpy.array([[x * x * t + c, x * y * t - z * s, x * z * t + y * s, 0],
+                        [y * x * t + z * s, y * y * t + c, y * z * t - x * s, 0],
+                        [z * x * t - y * s, z * y * t + x * s, z * z * t + c, 0],
+                        [0, 0, 0, 1]])
+
+
+def translation_matrix(x, y, z):
+    """Return the translation matrix set by `glTranslatef`."""
+    matrix = numpy.identity(4)
+    matrix[:3, 3] = x, y, z
+    return matrix
+
+
+def camera_matrix(position, rotation, aspect):
+    """Return the projection x modelview matrix used to draw the world, as
+    set up by `graphics.BlockGroup`.
+
+    :param position: The (x, y, z) position of the camera.
+    :param rotation: The (horizontal, vertical) rotation of the camera, in degrees.
+    :param aspect: The aspect ratio (width / height) of the viewport.
+    """
+    rx, ry = rotation
+    matrix = perspective_matrix(FIELD_OF_VIEW, aspect, NEAR_PLANE, FAR_PLANE)
+    matrix = matrix @ rotation_matrix(rx, 0, 1, 0)
+    matrix = matrix @ rotation_matrix(-ry, math.cos(math.radians(rx)), 0, math.sin(math.radians(rx)))
+    x, y, z = position
+    return matrix @ translation_matrix(-x, -y, -z)
+
+
+def frustum_planes(matrix):
+    """Extract the 6 clipping planes of a projection x modelview matrix.
+
+    :return: An array of shape (6, 4). A point (x, y, z) is on the inner side
+             of a plane (a, b, c, d) when a*x + b*y + c*z + d >= 0.
+    """
+    planes = numpy.array([matrix[3] + matrix[0], matrix[3] - matrix[0],
+                          matrix[3] + matrix[1], matrix[3] - matrix[1],
+                          matrix[3] + matrix[2], matrix[3] - matrix[2]])
+    return planes / numpy.linalg.norm(planes[:, :3], axis=1)[:, numpy.newaxis]
+
+
+def boxes_visible(planes, mins, maxs):
+    """Test axis aligned boxes against the frustum.
+
+    A box is culled only when it lies entirely outside one of the planes, so
+    a few boxes near the corners of the frustum may be kept while invisible.
+
+    :param planes: Frustum planes, as returned by `frustum_planes`.
+    :param mins: Array of shape (n, 3) of the minimum corners of the boxes.
+    :param maxs: Array of shape (n, 3) of the maximum corners of the boxes.
+    :return: A bool array of shape (n,).
+    """
+    normals = planes[:, :3]
+    # For each plane, the corner of each box the furthest along its normal:
+    corners = numpy.where(normals[numpy.newaxis] > 0, maxs[:, numpy.newaxis], mins[:, numpy.newaxis])
+    distances = (corners * normals).sum(axis=2) + planes[:, 3]
+    return (distances >= 0).all(axis=1)
+
+
+def sector_bounds(sectors):
+    """Return the (mins, maxs) corners of the boxes holding the blocks of
+    the given sectors.
+
+    :param sectors: A sequence of sectors.
+    """
+    sectors = numpy.array(sectors, dtype=float).reshape(-1, 3)
+    mins = sectors * SECTOR_SIZE - 0.5
+    mins[:, 1] = WORLD_BOTTOM - 0.5
+    maxs = mins + (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE)
+    return mins, maxs
+
+
+def visible_sectors(sectors, position, rotation, aspect):
+    """Return the list of the `sectors` which may be seen by the camera.
+
+    :param sectors: A sequence of sectors.
+    :param position: The (x, y, z) position of the camera.
+    :param rotation: The (horizontal, vertical) rotation of the camera, in degrees.
+    :param aspect: The aspect ratio (width / height) of the viewport.
+    """
+    sectors = list(sectors)
+    if not sectors:
+        return []
+    planes = frustum_planes(camera_matrix(position, rotation, aspect))
+    visible = boxes_visible(planes, *sector_bounds(sectors))
+    return [sector for sector, keep in zip(sectors, visible) if keep]
@@ -34,47 +34,251 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import math
 import random
 
+import numpy
+
 from .blocks import *
 from .utilities import *
-from .graphics import BlockGroup
-
-def generate_world(self):
-        """Randomly generate a new world and place all the blocks"""
-        n = 80  # 1/2 width and height of world
-        s = 1  # step size
-        y = 0  # initial y height
-
-        for x in range(-n, n + 1, s):
-            for z in range(-n, n + 1, s):
-                # create a layer stone an DIRT_WITH_GRASS everywhere.
-                self.add_block((x, y - 2, z), DIRT_WITH_GRASS, immediate=True)
-                self.add_block((x, y - 3, z), BEDSTONE, immediate=False)
-                if x in (-n, n) or z in (-n, n):
-                    # create outer walls.
-                    # Setting values for the Bedrock (depth, and height of the perimeter wall).
-                    for dy in range(-2, 9):
-                        self.add_block((x, y + dy, z), BEDSTONE, immediate=False)
-
-        # generate the hills randomly
 
-        if not HILLS_ON:
-            return
+CHUNK_SHAPE = (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE)
+
+
+class TerrainGenerator:
+    """A base class for all terrain generators to inherit from.
+
+    A generator builds the terrain one chunk at a time: `generate_chunk`
+    must return the block ids of a whole chunk, only depending on the
+    seed and on the sector. This way chunks can be generated in any order,
+    and generating the same chunk twice gives the same blocks.
+    """
+
+    name = None
+
+    def __init__(self, seed):
+        """
+        :param seed: int: The seed of the world.
+        """
+        self.seed = seed
+
+    def generate_chunk(self, sector):
+        """Return the block ids of the chunk of `sector`.
+
+        :param sector: The sector to generate.
+        :return: An uint8 array of shape (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE),
+                 indexed by the position relative to the chunk origin (see
+                 `world.ChunkStore.origin`).
+        """
+        raise NotImplementedError
+
+
+class FlatGenerator(TerrainGenerator):
+    """An endless flat map: a layer of DIRT_WITH_GRASS over BEDSTONE."""
+
+    name = 'flat'
+
+    def generate_chunk(self, sector):
+        ids = numpy.zeros(CHUNK_SHAPE, dtype=numpy.uint8)
+        ids[:, -2 - WORLD_BOTTOM, :] = DIRT_WITH_GRASS.id
+        ids[:, -3 - WORLD_BOTTOM, :] = BEDSTONE.id
+        return ids
 
-        o = n - 10
+
+class HillsGenerator(TerrainGenerator):
+    """The historical TerraCraft map: a 161 x 161 square of grass enclosed
+    by BEDSTONE walls, with 120 random hills of grass, snow or sand.
+    """
+
+    name = 'hills'
+
+    n = 80  # 1/2 width and height of world
+    c = -1  # base of the hills
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        # Draw all the hills up front, as they span several chunks.
+        rng = random.Random(seed)
+        self.hills = []
+        o = self.n - 10
         for _ in range(120):
-            a = random.randint(-o, o)  # x position of the hill
-            b = random.randint(-o, o)  # z position of the hill
-            c = -1  # base of the hill
-            h = random.randint(1, 6)  # height of the hill
-            s = random.randint(4, 8)  # 2 * s is the side length of the hill
-            d = 1  # how quickly to taper off the hills
-            block = random.choice([DIRT_WITH_GRASS, SNOW, SAND])
-            for y in range(c, c + h):
-                for x in range(a - s, a + s + 1):
-                    for z in range(b - s, b + s + 1):
-                        if (x - a) ** 2 + (z - b) ** 2 > (s + 1) ** 2:
-                            continue
-                        if (x - 0) ** 2 + (z - 0) ** 2 < 5 ** 2:  # 6 = flat map
-                            continue
-                        self.add_block((x, y, z), block, immediate=False)
-                s -= d  # decrement side length so hills taper off
\ No newline at end of file
+            a = rng.randint(-o, o)  # x position of the hill
+            b = rng.randint(-o, o)  # z position of the hill
+            h = rng.randint(1, 6)  # height of the hill
+            s = rng.randint(4, 8)  # 2 * s is the side length of the hill
+            block = rng.choice([DIRT_WITH_GRASS, SNOW, SAND])
+            self.hills.append((a, b, h, s, block))
+
+    def generate_chunk(self, sector):
+        n = self.n
+        ids = numpy.zeros(CHUNK_SHAPE, dtype=numpy.uint8)
+        sx, _, sz = sector
+        x0, z0 = sx * SECTOR_SIZE, sz * SECTOR_SIZE
+        # World coordinates of the columns of the chunk:
+        xs = numpy.arange(x0, x0 + SECTOR_SIZE)[:, numpy.newaxis]
+        zs = numpy.arange(z0, z0 + SECTOR_SIZE)[numpy.newaxis, :]
+        inside = (abs(xs) <= n) & (abs(zs) <= n)
+        if not inside.any():
+            return ids
+
+        # create a layer stone an DIRT_WITH_GRASS everywhere.
+        ids[:, -2 - WORLD_BOTTOM, :][inside] = DIRT_WITH_GRASS.id
+        ids[:, -3 - WORLD_BOTTOM, :][inside] = BEDSTONE.id
+        # create outer walls.
+        # Setting values for the Bedrock (depth, and height of the perimeter wall).
+        walls = inside & ((abs(xs) == n) | (abs(zs) == n))
+        for y in range(-2, 9):
+            ids[:, y - WORLD_BOTTOM, :][walls] = BEDSTONE.id
+
+        if not HILLS_ON:
+            return ids
+
+        flat = xs ** 2 + zs ** 2 < 5 ** 2  # 6 = flat map
+        d = 1  # how quickly to taper off the hills
+        # Later hills overwrite the earlier ones where they overlap.
+        for a, b, h, s, block in self.hills:
+            if a + s < x0 or a - s >= x0 + SECTOR_SIZE or b + s < z0 or b - s >= z0 + SECTOR_SIZE:
+                continue
+            for y in range(self.c, self.c + h):
+                if s < 0:
+                    break
+                # The disc of the layer, within its (2 * s + 1) wide square:
+                window = (slice(max(a - s - x0, 0), max(a + s + 1 - x0, 0)),
+                          slice(max(b - s - z0, 0), max(b + s + 1 - z0, 0)))
+                disc = (xs[window[0]] - a) ** 2 + (zs[:, window[1]] - b) ** 2 <= (s + 1) ** 2
+                disc &= ~flat[window]
+                ids[window[0], y - WORLD_BOTTOM, window[1]][disc] = block.id
+                s -= d  # decrement side length so hills taper off
+        return ids
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+# Gradient directions of the Perlin noise.
+_GRADIENTS = numpy.array([(1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1)],
+                         dtype=float)
+
+
+def perlin(x, z, permutation):
+    """2D Perlin gradient noise, roughly in [-1, 1].
+
+    :param x: Array of x coordinates.
+    :param z: Array of z coordinates, broadcastable with `x`.
+    :param permutation: A permutation of range(256), repeated twice.
+    :return: The noise at each (x, z) point.
+    """
+    x0 = numpy.floor(x)
+    z0 = numpy.floor(z)
+    fx = x - x0
+    fz = z - z0
+    xi = x0.astype(int) & 255
+    zi = z0.astype(int) & 255
+
+    def corner(dx, dz):
+        gradient = _GRADIENTS[permutation[permutation[xi + dx] + zi + dz] & 7]
+        return gradient[..., 0] * (fx - dx) + gradient[..., 1] * (fz - dz)
+
+    u = _fade(fx)
+    v = _fade(fz)
+    bottom = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+    top = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+    return bottom + v * (top - bottom)
+
+
+class NoiseGenerator(TerrainGenerator):
+    """An endless map of rolling hills, from a multi-octave Perlin noise
+    heightmap. Low ground is sand, high ground is covered with snow.
+    """
+
+    name = 'noise'
+
+    scale = 1 / 64  # Frequency of the first octave, in 1 / blocks.
+    octaves = 4
+    persistence = 0.5  # Amplitude ratio between two octaves.
+    ground_level = 4  # Mean height of the surface.
+    amplitude = 16  # Height variation, in blocks.
+    sand_level = 1
+    snow_level = 14
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        permutation = numpy.random.RandomState(seed % (1 << 32)).permutation(256)
+        self.permutation = numpy.concatenate((permutation, permutation))
+
+    def heightmap(self, sector):
+        """Return the y position of the surface of each column of the chunk."""
+        sx, _, sz = sector
+        xs = numpy.arange(sx * SECTOR_SIZE, (sx + 1) * SECTOR_SIZE)[:, numpy.newaxis]
+        zs = numpy.arange(sz * SECTOR_SIZE, (sz + 1) * SECTOR_SIZE)[numpy.newaxis, :]
+        noise = numpy.zeros((SECTOR_SIZE, SECTOR_SIZE))
+        frequency = self.scale
+        amplitude = 1.0
+        total = 0.0
+        for _ in range(self.octaves):
+            noise += amplitude * perlin(xs * frequency, zs * frequency, self.permutation)
+            total += amplitude
+            frequency *= 2
+            amplitude *= self.persistence
+        # The fBm noise stays within about [-0.5, 0.5].
+        heights = numpy.rint(noise / total * 2 * self.amplitude).astype(int) + self.ground_level
+        # The surface never goes below -2, like the other maps.
+        return numpy.maximum(heights, -2)
+
+    def generate_chunk(self, sector):
+        heights = self.heightmap(sector)
+        ys = numpy.arange(WORLD_BOTTOM, WORLD_BOTTOM + WORLD_HEIGHT)[numpy.newaxis, :, numpy.newaxis]
+        surface = heights[:, numpy.newaxis, :]
+        ids = numpy.zeros(CHUNK_SHAPE, dtype=numpy.uint8)
+        ids[(ys >= -2) & (ys < surface)] = DIRT.id
+        top = numpy.where(surface <= self.sand_level, SAND.id,
+                          numpy.where(surface >= self.snow_level, SNOW.id, DIRT_WITH_GRASS.id))
+        ids[:] = numpy.where(ys == surface, top, ids)
+        ids[:, -3 - WORLD_BOTTOM, :] = BEDSTONE.id
+        return ids
+
+
+# The available generators, by name.
+GENERATORS = {generator.name: generator for generator in (FlatGenerator, HillsGenerator, NoiseGenerator)}
+
+
+def create_generator(name=WORLD_GENERATOR, seed=None):
+    """Create a terrain generator.
+
+    :param name: The name of the generator, a key of `GENERATORS`.
+    :param seed: The seed of the world. If None, a random one is picked.
+    """
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    return GENERATORS[name](seed)
+
+
+# Generators used by `generate_chunk`, by (name, seed).
+_generators = {}
+
+
+def generate_chunk(name, seed, chunk_x, chunk_z):
+    """Generate a chunk with a generator identified by its name and seed.
+
+    Meant to run in a worker process (see `Model`): only these small values
+    are sent to the worker, and only the compact array of block ids comes
+    back. Each worker creates a generator once per (name, seed), and keeps
+    it for the next chunks.
+
+    :return: The block ids of the chunk, see `TerrainGenerator.generate_chunk`.
+    """
+    generator = _generators.get((name, seed))
+    if generator is None:
+        generator = _generators[name, seed] = GENERATORS[name](seed)
+    return generator.generate_chunk((chunk_x, 0, chunk_z))
+
+
+def generate_world(self, generator, radius=5):
+    """Generate all the chunks within `radius` sectors of the origin, and
+    place all their blocks.
+
+    :param generator: The `TerrainGenerator` to use.
+    :param radius: The half width of the square of sectors, in sectors.
+    """
+    for sx in range(-radius, radius + 1):
+        for sz in range(-radius, radius + 1):
+            sector = sx, 0, sz
+            self.set_chunk(sector, generator.generate_chunk(sector))
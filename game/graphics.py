@@ -32,8 +32,11 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import numpy
+import pyglet
+
 from pyglet.gl import *
-from pyglet.graphics import OrderedGroup
+from pyglet.graphics import OrderedGroup, TextureGroup
 
 from .config import *
 
@@ -76,6 +79,48 @@ def setup_opengl():
     setup_fog()
 
 
+def create_tile_groups(texture, size, parent):
+    """ Create one texture per tile of a texture atlas, set to repeat, and
+    a Group binding each of them. This allows a single quad to cover several
+    blocks with the same tile, as done by greedy meshing.
+
+    :param texture: The texture atlas.
+    :param size: The number of tiles on each side of the atlas.
+    :param parent: The parent Group, setting the 3D projection.
+    :return: A dictionary mapping the tile index, counted row by row from
+             the bottom left of the atlas, to its Group.
+    """
+    width = texture.width // size
+    height = texture.height // size
+    groups = {}
+    for row in range(size):
+        for column in range(size):
+            image = texture.get_region(column * width, row * height, width, height).get_image_data()
+            tile = image.get_texture()
+            glBindTexture(tile.target, tile.id)
+            glTexParameteri(tile.target, GL_TEXTURE_WRAP_S, GL_REPEAT)
+            glTexParameteri(tile.target, GL_TEXTURE_WRAP_T, GL_REPEAT)
+            glTexParameteri(tile.target, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(tile.target, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            groups[column + row * size] = TextureGroup(tile, parent=parent)
+    return groups
+
+
+def capture_thumbnail(width):
+    """Return a small copy of the current content of the color buffer.
+
+    :param width: int: The width of the thumbnail, in pixels.
+    :return: A tuple (width, height, data), with the RGB pixels in `data`,
+             row by row from the bottom.
+    """
+    image = pyglet.image.get_buffer_manager().get_color_buffer().get_image_data()
+    pixels = numpy.frombuffer(image.get_data('RGB', image.width * 3), dtype=numpy.uint8)
+    pixels = pixels.reshape((image.height, image.width, 3))
+    step = max(1, image.width // width)
+    thumbnail = numpy.ascontiguousarray(pixels[::step, ::step][:, :width])
+    return thumbnail.shape[1], thumbnail.shape[0], thumbnail.tobytes()
+
+
 class BlockGroup(OrderedGroup):
     """A Group for all 3D elements, such as Blocks.
 
@@ -102,7 +147,7 @@ class BlockGroup(OrderedGroup):
         glViewport(0, 0, width, height)
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        gluPerspective(65.0, width / float(height), 0.1, 60.0)
+        gluPerspective(FIELD_OF_VIEW, width / float(height), NEAR_PLANE, FAR_PLANE)
         glMatrixMode(GL_MODELVIEW)
         glLoadIdentity()
         x, y = self.rotation
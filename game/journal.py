@@ -0,0 +1,136 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import numpy
+
+
+# A journal is a sequence of records, one per block edit, in the order they
+# were made. A record of id 0 is a block removal. All integers are
+# little-endian.
+RECORD = numpy.dtype([('x', '<i4'), ('y', '<i4'), ('z', '<i4'), ('id', '<u2')])
+
+
+class Journal:
+    """A write-ahead log of the block edits made since the last save.
+
+    Edits are first kept in memory, then appended to the file in batches by
+    `flush`. Replaying the journal on top of the last save (see
+    `read_journal`) recovers the edits which the save does not hold yet.
+    Once a save holds them, `truncate` drops them from the journal.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the journal file. New edits are appended to
+                     the ones already in the file.
+        """
+        self.path = path
+        self._file = open(path, 'ab')
+        # Records not written to the file yet.
+        self._pending = []
+        # Number of bytes ever written, including the ones dropped by
+        # `truncate`, and the number of bytes dropped.
+        self._written = self._file.tell()
+        self._dropped = 0
+
+    def __len__(self):
+        """The number of edits in the journal."""
+        return (self._written - self._dropped) // RECORD.itemsize + len(self._pending)
+
+    def record(self, position, block_id):
+        """Add an edit to the journal.
+
+        :param position: The (x, y, z) position of the edited block.
+        :param block_id: The id of the new block, 0 if it was removed.
+        """
+        self._pending.append((*position, block_id))
+
+    def flush(self):
+        """Write the pending edits to the file."""
+        if not self._pending:
+            return
+        data = numpy.array(self._pending, dtype=RECORD).tobytes()
+        self._pending = []
+        self._file.write(data)
+        self._file.flush()
+        self._written += len(data)
+
+    def mark(self):
+        """Write the pending edits, and return a mark of the current end of
+        the journal, to pass to `truncate`.
+        """
+        self.flush()
+        return self._written
+
+    def truncate(self, mark):
+        """Drop the edits recorded before `mark`, once they have been saved.
+
+        The edits recorded since then are moved to a new file, which
+        replaces the journal.
+        """
+        if mark <= self._dropped:
+            return
+        self.flush()
+        self._file.close()
+        with open(self.path, 'rb') as file:
+            file.seek(mark - self._dropped)
+            data = file.read()
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, self.path)
+        self._dropped = mark
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def read_journal(path):
+    """Read the edits of a journal file.
+
+    A record only partly written, e.g. if the game crashed while writing
+    it, is ignored.
+
+    :return: A tuple (positions, ids): an int array of shape (n, 3) of the
+             positions of the edited blocks, and an array of shape (n,) of
+             their new ids, in the order of the edits.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    records = numpy.frombuffer(data[:len(data) - len(data) % RECORD.itemsize], dtype=RECORD)
+    positions = numpy.stack((records['x'], records['y'], records['z']), axis=-1).astype(int)
+    return positions, records['id'].astype(numpy.intp)
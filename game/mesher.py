@@ -0,0 +1,239 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import numpy
+
+from .blocks import BLOCKS, FACES
+from .config import *
+from .utilities import cube_vertices
+
+
+# Vertices of the faces of a Block at the origin, as an array of shape
+# (6, 4, 3). Faces are in the same order as `FACES`.
+FACE_VERTICES = numpy.array(cube_vertices(0, 0, 0, 0.5), dtype=numpy.float32).reshape(6, 4, 3)
+
+# Texture coordinates of the 4 vertices of a face, relative to its tile.
+QUAD_TEX_COORDS = numpy.array(((0, 0), (1, 0), (1, 1), (0, 1)), dtype=numpy.float32)
+
+
+def padded_ids(world, sector):
+    """Return the block ids of `sector`, padded by one block on each side.
+
+    The padding holds the borders of the neighbor sectors, so that the
+    neighbors of every block of the sector can be looked up with slices.
+    Above and below the world, the padding is air.
+
+    :param world: The `world.ChunkStore` holding the blocks.
+    :param sector: The sector to read.
+    :return: An array of shape (SECTOR_SIZE + 2, WORLD_HEIGHT + 2, SECTOR_SIZE + 2)
+    """
+    padded = numpy.zeros((SECTOR_SIZE + 2, WORLD_HEIGHT + 2, SECTOR_SIZE + 2), dtype=numpy.uint16)
+    sx, _, sz = sector
+    chunk = world.chunks.get(sector)
+    if chunk is not None:
+        padded[1:-1, 1:-1, 1:-1] = chunk.ids()
+    # Borders of the 4 horizontal neighbors:
+    neighbors = ((-1, 0, (0, slice(1, -1), slice(1, -1)), (-1, slice(None), slice(None))),
+                 (1, 0, (-1, slice(1, -1), slice(1, -1)), (0, slice(None), slice(None))),
+                 (0, -1, (slice(1, -1), slice(1, -1), 0), (slice(None), slice(None), -1)),
+                 (0, 1, (slice(1, -1), slice(1, -1), -1), (slice(None), slice(None), 0)))
+    for dx, dz, target, source in neighbors:
+        chunk = world.chunks.get((sx + dx, 0, sz + dz))
+        if chunk is not None:
+            padded[target] = chunk.ids()[source]
+    return padded
+
+
+def exposed_mask(padded):
+    """Return a bool array telling which blocks of a padded sector are
+    exposed, i.e. not surrounded on all 6 sides by opaque blocks.
+
+    :param padded: Block ids, as returned by `padded_ids`.
+    """
+    opaque = BLOCKS.opaque[padded]
+    covered = (opaque[2:, 1:-1, 1:-1] & opaque[:-2, 1:-1, 1:-1] &
+               opaque[1:-1, 2:, 1:-1] & opaque[1:-1, :-2, 1:-1] &
+               opaque[1:-1, 1:-1, 2:] & opaque[1:-1, 1:-1, :-2])
+    return (padded[1:-1, 1:-1, 1:-1] != 0) & ~covered
+
+
+def face_masks(padded):
+    """Return, for each of the 6 `FACES`, a bool array telling which faces of
+    the blocks of a padded sector are visible, i.e. not touching an opaque
+    neighbor in that direction.
+
+    :param padded: Block ids, as returned by `padded_ids`.
+    :return: A list of 6 arrays, in `FACES` order.
+    """
+    opaque = BLOCKS.opaque[padded]
+    solid = padded[1:-1, 1:-1, 1:-1] != 0
+    masks = []
+    for dx, dy, dz in FACES:
+        neighbor = opaque[1 + dx:opaque.shape[0] - 1 + dx,
+                          1 + dy:opaque.shape[1] - 1 + dy,
+                          1 + dz:opaque.shape[2] - 1 + dz]
+        masks.append(solid & ~neighbor)
+    return masks
+
+
+def build_sector_mesh(world, sector, greedy=GREEDY_MESHING):
+    """Build the geometry of all the visible faces of a sector.
+
+    Faces touching an opaque neighbor are never emitted.
+
+    :param world: The `world.ChunkStore` holding the blocks.
+    :param sector: The sector to mesh.
+    :param greedy: Whether or not to merge coplanar faces (see `greedy_quads`).
+    :return: A list of (tile, vertices, tex_coords) tuples, where vertices
+             and tex_coords are flat float32 arrays to be drawn as GL_QUADS.
+             With greedy meshing there is one tuple per atlas tile, and the
+             texture coordinates are relative to that tile. Otherwise there
+             is a single tuple, with a tile of None and texture coordinates in
+             the atlas. The list is empty if nothing is visible.
+    """
+    return mesh_padded(padded_ids(world, sector), sector, greedy)
+
+
+def mesh_padded(padded, sector, greedy=GREEDY_MESHING):
+    """Build the geometry of a sector from a copy of its block ids.
+
+    This only works on NumPy arrays and never touches the world or OpenGL,
+    so it can run in a worker thread while the world keeps changing.
+
+    :param padded: Block ids of the sector, as returned by `padded_ids`.
+    :param sector: The sector to mesh.
+    :param greedy: Whether or not to merge coplanar faces.
+    :return: See `build_sector_mesh`.
+    """
+    ids = padded[1:-1, 1:-1, 1:-1]
+    sx, _, sz = sector
+    origin = numpy.array((sx * SECTOR_SIZE, WORLD_BOTTOM, sz * SECTOR_SIZE), dtype=numpy.float32)
+    if greedy:
+        parts = {}
+        for face, mask in enumerate(face_masks(padded)):
+            tiles = numpy.where(mask, BLOCKS.tiles[ids, face] + 1, 0)
+            for tile, vertices, tex_coords in greedy_quads(tiles, face, origin):
+                part = parts.setdefault(tile, ([], []))
+                part[0].append(vertices)
+                part[1].append(tex_coords)
+        return [(tile, numpy.concatenate(vertices).ravel(), numpy.concatenate(tex_coords).ravel())
+                for tile, (vertices, tex_coords) in sorted(parts.items())]
+
+    vertices = []
+    tex_coords = []
+    for face, mask in enumerate(face_masks(padded)):
+        indices = numpy.nonzero(mask)
+        positions = numpy.stack(indices, axis=-1).astype(numpy.float32) + origin
+        vertices.append(positions[:, numpy.newaxis, :] + FACE_VERTICES[face])
+        tex_coords.append(BLOCKS.tex_coords[ids[indices], face])
+    vertices = numpy.concatenate(vertices).ravel()
+    if len(vertices) == 0:
+        return []
+    return [(None, vertices, numpy.concatenate(tex_coords).ravel())]
+
+
+def greedy_rectangles(grid):
+    """Cover the non-zero cells of a 2D grid with rectangles of equal values.
+
+    Rectangles are grown greedily: first along the second axis, then along
+    the first one, as long as all the covered cells hold the same value.
+
+    :param grid: A 2D list of ints, 0 for empty cells.
+    :return: A list of (u, v, height, width, value) tuples.
+    """
+    size_u = len(grid)
+    size_v = len(grid[0])
+    done = [[False] * size_v for _ in range(size_u)]
+    rectangles = []
+    for u in range(size_u):
+        row = grid[u]
+        for v in range(size_v):
+            value = row[v]
+            if value == 0 or done[u][v]:
+                continue
+            width = 1
+            while v + width < size_v and row[v + width] == value and not done[u][v + width]:
+                width += 1
+            height = 1
+            while u + height < size_u:
+                next_row = grid[u + height]
+                next_done = done[u + height]
+                if any(next_row[i] != value or next_done[i] for i in range(v, v + width)):
+                    break
+                height += 1
+            for i in range(u, u + height):
+                done[i][v:v + width] = [True] * width
+            rectangles.append((u, v, height, width, value))
+    return rectangles
+
+
+def greedy_quads(tiles, face, origin):
+    """Merge the visible faces of one direction into larger quads.
+
+    :param tiles: Array of shape (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE) of
+                  the atlas tile + 1 of each visible face, 0 where no face
+                  is visible.
+    :param face: The index of the face direction in `FACES`.
+    :param origin: World position of the first block of the sector.
+    :return: A list of (tile, vertices, tex_coords) tuples, with arrays of
+             shape (n, 4, 3) and (n, 4, 2) holding the merged quads.
+    """
+    axis = [abs(d) for d in FACES[face]].index(1)
+    others = [i for i in range(3) if i != axis]
+    slices = numpy.moveaxis(tiles, axis, 0)
+    rectangles = []
+    for depth in numpy.nonzero(slices.reshape(len(slices), -1).any(axis=1))[0]:
+        for u, v, height, width, value in greedy_rectangles(slices[depth].tolist()):
+            rectangles.append((depth, u, v, u + height - 1, v + width - 1, value - 1))
+    if not rectangles:
+        return []
+    rectangles = numpy.array(rectangles)
+    mins = numpy.zeros((len(rectangles), 3), dtype=numpy.float32)
+    maxs = numpy.zeros((len(rectangles), 3), dtype=numpy.float32)
+    mins[:, axis] = maxs[:, axis] = rectangles[:, 0]
+    mins[:, others] = rectangles[:, 1:3]
+    maxs[:, others] = rectangles[:, 3:5]
+    # Stretch the face of a unit block over the whole rectangle:
+    corners = FACE_VERTICES[face]
+    vertices = numpy.where(corners < 0,
+                           mins[:, numpy.newaxis, :] - 0.5,
+                           maxs[:, numpy.newaxis, :] + 0.5) + origin
+    # Repeat the texture once per block, in the orientation of a unit face:
+    size_s = numpy.abs(vertices[:, 1] - vertices[:, 0]).sum(axis=1)
+    size_t = numpy.abs(vertices[:, 3] - vertices[:, 0]).sum(axis=1)
+    tex_coords = QUAD_TEX_COORDS * numpy.stack((size_s, size_t), axis=-1)[:, numpy.newaxis, :]
+    result = []
+    for tile in numpy.unique(rectangles[:, 5]):
+        selection = rectangles[:, 5] == tile
+        result.append((int(tile), vertices[selection], tex_coords[selection]))
+    return result
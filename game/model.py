@@ -0,0 +1,549 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import multiprocessing
+
+import numpy
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .config import *
+from .genworld import generate_chunk
+from .raycast import raycast, raycast_many
+from .region import RegionFormatError
+from .utilities import ring_offsets, sectorize
+from .world import ChunkStore, compress_chunk, decompress_chunk
+
+
+class Model(object):
+    """The state of the world: its blocks, and the chunks loaded around the
+    player, generated, read from the region file or kept compressed.
+
+    It does not depend on pyglet, so that worlds can be generated, edited
+    and saved without a window. Views of the world, e.g. the renderer,
+    attach as observers (see `add_observer`) and are notified of the changes
+    by the following events:
+
+    - `on_block_changed(position, immediate)`: a single block was added or
+      removed.
+    - `on_sectors_changed(sectors)`: many blocks of the chunks of `sectors`
+      were changed at once, or the chunks were loaded.
+    - `on_chunk_evicted(sector)`: the chunk of `sector` was freed.
+    """
+
+    def __init__(self):
+        # A mapping from position to the texture of the block at that position.
+        # This defines all the blocks that are currently in the world. Blocks
+        # are stored by sectors, in compact arrays (see `world.ChunkStore`).
+        self.world = ChunkStore()
+
+        # The terrain generator of the world (see `genworld.create_generator`).
+        # Chunks are generated on demand around the player. None for worlds
+        # saved without their generator, which have no terrain beyond their
+        # saved chunks.
+        self.generator = None
+
+        # The set of sectors whose chunk is in memory, generated or loaded.
+        self.loaded = set()
+
+        # The set of sectors modified since they have been generated. Their
+        # blocks can no longer be generated again, so they must be saved.
+        self.modified = set()
+
+        # The set of sectors modified since the world was last saved or
+        # loaded. Only their chunks are written by the next save.
+        self.dirty = set()
+
+        # Mapping from sector to the compressed block ids of the modified
+        # chunks evicted from memory (see `world.compress_chunk`).
+        self._evicted = {}
+
+        # The region file the world was loaded from or last saved to, if any
+        # (see `region.RegionFile`), and the set of sectors whose chunk is up
+        # to date in that file. These chunks are read from the file when
+        # needed, instead of being kept in memory.
+        self.region = None
+        self.stored = set()
+
+        # The set of sectors whose saved chunk could not be read from the
+        # region file. They are generated again instead, and the file must
+        # no longer be saved over (see `savemanager.SaveManager.save_world`).
+        self.unreadable = set()
+
+        # The objects notified of the changes of the world.
+        self.observers = []
+
+        # The sector the player is in, and the number of sectors loaded around.
+        self.sector = None
+        self.set_load_distance(RENDER_DISTANCE + 1)
+
+        # Chunks saved in the region file are read by a worker thread.
+        self._reader = ThreadPoolExecutor(max_workers=1)
+
+        # Chunks are generated by worker processes, so that generation uses
+        # all the cores, then inserted in the world by the main thread. The
+        # workers are spawned rather than forked, as they need neither the
+        # threads nor the OpenGL state of the game. A spawned worker imports
+        # the main script again, which must not import pyglet at the top
+        # level (see main.py).
+        self._generator_executor = ProcessPoolExecutor(max_workers=GENERATION_WORKERS,
+                                                       mp_context=multiprocessing.get_context('spawn'))
+
+        # Mapping from sector to the future of the chunk being read or generated.
+        self._generating = {}
+
+    def add_observer(self, observer):
+        """ Notify `observer` of the changes of the world, by calling its
+        methods named after the events (see `Model`). Events it has no
+        method for are ignored.
+
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """ Stop notifying `observer` of the changes of the world.
+
+        """
+        self.observers.remove(observer)
+
+    def _notify(self, event, *args):
+        """ Call the method named `event` of each observer.
+
+        """
+        for observer in self.observers:
+            handler = getattr(observer, event, None)
+            if handler is not None:
+                handler(*args)
+
+    def hit_test(self, position, vector, max_distance=NODE_SELECTOR):
+        """ Line of sight search from current position. If a block is
+        intersected it is returned, along with the block previously in the line
+        of sight. If no block is found, return None, None.
+
+        Parameters
+        ----------
+        position : tuple of len 3
+            The (x, y, z) position to check visibility from.
+        vector : tuple of len 3
+            The line of sight vector.
+        max_distance : int
+            How many blocks away to search for a hit.
+
+        """
+        block, face = raycast(self.world, position, vector, max_distance)
+        if face is None:
+            return block, None
+        x, y, z = block
+        dx, dy, dz = face
+        return block, (x + dx, y + dy, z + dz)
+
+    def hit_test_many(self, positions, vectors, max_distance=NODE_SELECTOR):
+        """ Line of sight search for many rays at once, e.g. for tools or
+        for the line of sight of creatures.
+
+        Parameters
+        ----------
+        positions : array of shape (n, 3)
+            The (x, y, z) positions to check visibility from.
+        vectors : array of shape (n, 3)
+            The line of sight vectors.
+        max_distance : int
+            How many blocks away to search for a hit.
+
+        Returns
+        -------
+        A tuple (hit, blocks, faces) of a bool array, True for the rays which
+        hit a block, and of int arrays of shape (n, 3) of the positions of the
+        blocks hit and of the normals of their faces facing the rays, see
+        `raycast.raycast_many`.
+
+        """
+        return raycast_many(self.world, positions, vectors, max_distance)
+
+    def add_block(self, position, block, immediate=True):
+        """ Add a block with the given `texture` and `position` to the world.
+
+        Parameters
+        ----------
+        position : tuple of len 3
+            The (x, y, z) position of the block to add.
+        block : Block object
+            An instance of the Block class.
+        immediate : bool
+            Whether or not to draw the block immediately.
+
+        Returns
+        -------
+        True if the block was added, False if `position` is above or below
+        the world.
+
+        """
+        if not self.world.in_bounds(position):
+            return False
+        # The block is added on top of the terrain of its chunk.
+        self.load_chunks({sectorize(position)})
+        # Any block already at this position is replaced.
+        self.world[position] = block
+        self._touch_sectors({sectorize(position)})
+        self._notify('on_block_changed', position, immediate)
+        return True
+
+    def add_blocks(self, positions, ids):
+        """ Add many blocks to the world at once. Much faster than calling
+        add_block() for each of them: blocks are stored in a single pass, and
+        observers are notified once per modified sector.
+
+        Parameters
+        ----------
+        positions : array of shape (n, 3)
+            The (x, y, z) positions of the blocks to add.
+        ids : array of shape (n,)
+            The ids of the blocks to add (see `blocks.BLOCKS`). An id of 0
+            removes the block at that position.
+
+        """
+        positions = numpy.asarray(positions, dtype=int).reshape(-1, 3)
+        chunks = numpy.unique(positions[:, [0, 2]] // SECTOR_SIZE, axis=0)
+        self.load_chunks({(x, 0, z) for x, z in chunks.tolist()})
+        sectors = self.world.set_many(positions, ids)
+        self._touch_sectors(sectors)
+        self._notify('on_sectors_changed', sectors)
+
+    def fill_region(self, start, end, block_id):
+        """ Fill a box of the world with a single kind of block.
+
+        Parameters
+        ----------
+        start : tuple of len 3
+            The (x, y, z) position of a corner of the box.
+        end : tuple of len 3
+            The (x, y, z) position of the opposite corner, included.
+        block_id : int
+            The id of the block to fill with (see `blocks.BLOCKS`). An id of
+            0 removes all the blocks of the box.
+
+        """
+        low = numpy.minimum(start, end) // SECTOR_SIZE
+        high = numpy.maximum(start, end) // SECTOR_SIZE
+        self.load_chunks({(x, 0, z) for x in range(low[0], high[0] + 1)
+                          for z in range(low[2], high[2] + 1)})
+        sectors = self.world.fill(start, end, block_id)
+        self._touch_sectors(sectors)
+        self._notify('on_sectors_changed', sectors)
+
+    def remove_block(self, position, immediate=True):
+        """ Remove the block at the given `position`.
+
+        Parameters
+        ----------
+        position : tuple of len 3
+            The (x, y, z) position of the block to remove.
+        immediate : bool
+            Whether or not to immediately remove block from canvas.
+
+        """
+        self.load_chunks({sectorize(position)})
+        del self.world[position]
+        self._touch_sectors({sectorize(position)})
+        self._notify('on_block_changed', position, immediate)
+
+    def set_chunk(self, sector, ids):
+        """ Replace all the blocks of the chunk of a sector, e.g. with the
+        output of a terrain generator.
+
+        Parameters
+        ----------
+        sector : tuple of len 3
+            The (x, 0, z) tuple of the sector.
+        ids : array of shape (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE)
+            The block ids of the chunk, relative to its origin.
+
+        """
+        self.loaded.add(sector)
+        self._notify('on_sectors_changed', self.world.set_chunk(sector, ids))
+
+    def snapshot_chunks(self, sectors=None):
+        """ Return a copy of the chunks which have to be saved, as they
+        cannot be generated again. The copy is not affected by later changes
+        to the world, so it can be saved by another thread.
+
+        Parameters
+        ----------
+        sectors : set of tuples of len 3
+            Only return the chunks of these sectors, e.g. `dirty`. By
+            default, all the modified chunks are returned.
+
+        Returns
+        -------
+        chunks : dict
+            Mapping from sector to the blocks of its chunk: a
+            `world.ChunkSnapshot` for the chunks in memory, the compressed
+            block ids (see `world.compress_chunk`) for the evicted ones, and
+            the `region.RegionFile` to read them from for the others. These
+            are not read here, to leave it to the thread writing the save.
+
+        """
+        chunks = {}
+        for sector in self.modified if sectors is None else sectors & self.modified:
+            if sector in self._evicted:
+                chunks[sector] = self._evicted[sector]
+            elif sector in self.loaded:
+                chunks[sector] = self.world.snapshot(sector)
+            else:
+                chunks[sector] = self.region
+        return chunks
+
+    def set_region(self, region, sectors):
+        """ Set the region file holding the saved chunks of the world, after
+        it has been loaded or saved.
+
+        Parameters
+        ----------
+        region : `region.RegionFile`
+            The region file, open for reading. The previous one is closed,
+            unless it is the same.
+        sectors : set of tuples of len 3
+            The sectors whose chunk has been saved to the file. Their chunk is
+            up to date in the file, unless it has been modified since.
+
+        """
+        if self.region is not None and self.region is not region:
+            self.region.close()
+        self.region = region
+        self.stored.update(sectors - self.dirty)
+        for sector in self.stored:
+            self._evicted.pop(sector, None)
+
+    def _touch_sectors(self, sectors):
+        """ Mark `sectors` as modified, after blocks have been added to or
+        removed from them.
+
+        """
+        self.loaded.update(sectors)
+        self.modified.update(sectors)
+        self.dirty.update(sectors)
+        self.stored.difference_update(sectors)
+
+    def clear(self):
+        """ Remove the whole world, e.g. after it failed to load, so that a
+        new one can be generated in its place.
+
+        """
+        for future in self._generating.values():
+            future.cancel()
+        self._generating.clear()
+        for sector in list(self.world.chunks):
+            self._notify('on_chunk_evicted', sector)
+            self.world.pop_chunk(sector)
+        self.loaded.clear()
+        self.modified.clear()
+        self.dirty.clear()
+        self.stored.clear()
+        self.unreadable.clear()
+        self._evicted.clear()
+        if self.region is not None:
+            self.region.close()
+            self.region = None
+        self.generator = None
+
+    def set_load_distance(self, distance):
+        """ Set the number of sectors whose chunk is loaded around the player.
+        Chunks are only evicted once further than `distance + UNLOAD_MARGIN
+        + 1`, one sector beyond the hidden sectors, whose meshes need the
+        blocks of their neighbors.
+
+        """
+        self.load_distance = max(1, distance)
+        self._load_offsets = ring_offsets(self.load_distance)
+        self._evict_distance = self.load_distance + UNLOAD_MARGIN + 1
+        if self.sector is not None:
+            self.change_sectors(self.sector)
+
+    def change_sectors(self, after, motion=(0, 0, 0)):
+        """ Move to sector `after`: load the chunks around it, and evict the
+        chunks which are now too far.
+
+        Parameters
+        ----------
+        after : tuple of len 3
+            The sector the player is in.
+        motion : tuple of len 3
+            The motion vector of the player. The chunks around where the
+            player is heading to are loaded in advance.
+
+        """
+        self.sector = after
+        x, y, z = after
+        dx, dy, dz = motion
+        ahead_x = x + int(round(dx * PREFETCH_DISTANCE))
+        ahead_z = z + int(round(dz * PREFETCH_DISTANCE))
+        needed = [(x + ox, y, z + oz) for ox, _, oz in self._load_offsets]
+        needed += [(ahead_x + ox, y, ahead_z + oz) for ox, _, oz in self._load_offsets]
+        for sector in needed:
+            if sector not in self.loaded:
+                self._load_chunk(sector)
+        needed = set(needed)
+        limit = self._evict_distance ** 2
+        for sector in set(self.loaded) | set(self._generating):
+            sx, _, sz = sector
+            if sector not in needed and (sx - x) ** 2 + (sz - z) ** 2 > limit:
+                self._evict_chunk(sector)
+
+    def _load_chunk(self, sector):
+        """ Bring the chunk of `sector` into memory: restore it if it has
+        been modified and evicted, or else start reading it from the region
+        file, or generating it.
+
+        """
+        data = self._evicted.pop(sector, None)
+        if data is not None:
+            self.set_chunk(sector, decompress_chunk(data))
+        elif sector in self._generating:
+            return
+        elif sector in self.stored:
+            self._generating[sector] = self._reader.submit(self._read_chunk, sector)
+        elif self.generator is not None:
+            future = self._generator_executor.submit(generate_chunk, self.generator.name,
+                                                     self.generator.seed, sector[0], sector[2])
+            self._generating[sector] = future
+
+    def _read_chunk(self, sector):
+        """ Return the block ids of a chunk saved in the region file. Runs in
+        a worker thread.
+
+        """
+        return decompress_chunk(self.region.read(sector))
+
+    def _read_failed(self, sector, error):
+        """ Give up on the saved chunk of `sector`, which could not be read
+        because of `error`, and return its generated block ids instead.
+
+        """
+        self.unreadable.add(sector)
+        self.stored.discard(sector)
+        self.modified.discard(sector)
+        if self.generator is None:
+            return decompress_chunk(compress_chunk(None))
+        return self.generator.generate_chunk(sector)
+
+    def load_chunks(self, sectors):
+        """ Bring the chunks of `sectors` into memory right away, e.g. before
+        editing their blocks. Chunks are read or generated in this thread.
+
+        """
+        for sector in sectors:
+            if sector in self.loaded:
+                continue
+            future = self._generating.pop(sector, None)
+            if future is not None:
+                future.cancel()
+            data = self._evicted.pop(sector, None)
+            if data is not None:
+                self.set_chunk(sector, decompress_chunk(data))
+            elif sector in self.stored:
+                try:
+                    ids = self._read_chunk(sector)
+                except (OSError, ValueError, RegionFormatError) as error:
+                    ids = self._read_failed(sector, error)
+                self.set_chunk(sector, ids)
+            elif self.generator is not None:
+                self.set_chunk(sector, self.generator.generate_chunk(sector))
+
+    def _evict_chunk(self, sector):
+        """ Free the memory used by the chunk of `sector`. Modified chunks
+        are kept compressed, unless they are up to date in the region file.
+        The others can be generated again.
+
+        """
+        future = self._generating.pop(sector, None)
+        if future is not None:
+            future.cancel()
+        self._notify('on_chunk_evicted', sector)
+        self.loaded.discard(sector)
+        ids = self.world.pop_chunk(sector)
+        if sector not in self.stored and (sector in self.modified or self.generator is None):
+            # Never replace the blocks already kept with an empty chunk.
+            if ids is not None or sector not in self._evicted:
+                self._evicted[sector] = compress_chunk(ids)
+            if len(self._evicted) > MAX_EVICTED_CHUNKS and self.generator is not None:
+                # They were not saved in time: drop the oldest one, whose
+                # terrain is generated again when needed.
+                oldest = next(iter(self._evicted))
+                del self._evicted[oldest]
+                self.modified.discard(oldest)
+                self.dirty.discard(oldest)
+
+    @property
+    def evicted_count(self):
+        """ The number of modified chunks evicted from memory, kept
+        compressed until they are saved.
+
+        """
+        return len(self._evicted)
+
+    def insert_chunks(self, wait=False):
+        """ Insert the chunks read or generated by the workers in the world.
+
+        Parameters
+        ----------
+        wait : bool
+            Whether or not to wait for the chunks which are not ready yet.
+
+        """
+        for sector, future in list(self._generating.items()):
+            if wait or future.done():
+                del self._generating[sector]
+                try:
+                    ids = future.result()
+                except (OSError, ValueError, RegionFormatError) as error:
+                    if sector not in self.stored:
+                        raise
+                    ids = self._read_failed(sector, error)
+                # Blocks may have been loaded in the meantime, keep them.
+                if sector not in self.loaded:
+                    self.set_chunk(sector, ids)
+
+    def close(self):
+        """ Stop the workers reading and generating chunks, and close the
+        region file.
+
+        """
+        for future in self._generating.values():
+            future.cancel()
+        self._generating.clear()
+        self._reader.shutdown()
+        self._generator_executor.shutdown()
+        if self.region is not None:
+            self.region.close()
+            self.region = None
@@ -0,0 +1,170 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import math
+
+import numpy
+
+from .config import *
+
+
+def raycast(world, position, vector, max_distance=NODE_SELECTOR):
+    """Find the first block crossed by a ray.
+
+    The blocks crossed by the ray are visited in order, each exactly once,
+    by walking the grid from one block boundary to the next (Amanatides &
+    Woo, "A Fast Voxel Traversal Algorithm for Ray Tracing"). The block at
+    (x, y, z) spans from (x - 0.5, y - 0.5, z - 0.5) to (x + 0.5, y + 0.5,
+    z + 0.5).
+
+    :param world: The `ChunkStore` (or any container of block positions)
+                  to search.
+    :param position: The (x, y, z) origin of the ray.
+    :param vector: The (dx, dy, dz) direction of the ray.
+    :param max_distance: How far to search, in lengths of `vector`.
+    :return: A tuple (block, face) of the position of the block hit, and of
+             the normal of its face hit by the ray, e.g. (0, 1, 0) for its
+             top face. The face is None if the ray starts inside the block.
+             (None, None) if no block is hit.
+    """
+    voxel = [math.floor(p + 0.5) for p in position]
+    step = [0, 0, 0]
+    t_max = [math.inf] * 3
+    t_delta = [math.inf] * 3
+    for axis in range(3):
+        d = vector[axis]
+        if d > 0:
+            step[axis] = 1
+            t_max[axis] = (voxel[axis] + 0.5 - position[axis]) / d
+            t_delta[axis] = 1 / d
+        elif d < 0:
+            step[axis] = -1
+            t_max[axis] = (voxel[axis] - 0.5 - position[axis]) / d
+            t_delta[axis] = -1 / d
+
+    face = None
+    t = 0
+    while t <= max_distance:
+        block = tuple(voxel)
+        if block in world:
+            return block, face
+        # Cross the nearest block boundary (the first axis on ties, as
+        # `numpy.argmin` does in `raycast_many`):
+        if t_max[0] <= t_max[1]:
+            axis = 0 if t_max[0] <= t_max[2] else 2
+        else:
+            axis = 1 if t_max[1] <= t_max[2] else 2
+        t = t_max[axis]
+        voxel[axis] += step[axis]
+        t_max[axis] += t_delta[axis]
+        face = [0, 0, 0]
+        face[axis] = -step[axis]
+        face = tuple(face)
+    return None, None
+
+
+def _chunk_key(chunk_x, chunk_z):
+    """Return a single int64 sorting the chunks by x then by z, for arrays
+    of chunk coordinates.
+    """
+    return (numpy.asarray(chunk_x, dtype=numpy.int64) << 32) + (numpy.asarray(chunk_z, dtype=numpy.int64) + 2 ** 31)
+
+
+def raycast_many(world, positions, vectors, max_distance=NODE_SELECTOR):
+    """Find the first block crossed by many rays at once, see `raycast`.
+
+    The chunks the rays can reach are gathered once into a single array, then
+    all the rays advance together by one block per iteration: the cost is
+    driven by the longest ray rather than by the number of rays.
+
+    :param world: The `ChunkStore` to search.
+    :param positions: Float array of shape (n, 3) of the origins of the rays.
+    :param vectors: Float array of shape (n, 3) of the directions of the rays.
+    :param max_distance: How far to search, in lengths of the vectors.
+    :return: A tuple (hit, blocks, faces) of a bool array of shape (n,),
+             True for the rays which hit a block, and of int arrays of shape
+             (n, 3) of the positions of the blocks hit and of the normals of
+             their faces hit (zero if the ray starts inside the block). Rows
+             which did not hit anything are meaningless.
+    """
+    positions = numpy.asarray(positions, dtype=float).reshape(-1, 3)
+    vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+    n = len(positions)
+    voxels = numpy.floor(positions + 0.5).astype(int)
+    steps = numpy.sign(vectors).astype(int)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        moving = vectors != 0
+        t_delta = numpy.where(moving, numpy.abs(1 / vectors), numpy.inf)
+        t_max = numpy.where(moving, (voxels + 0.5 * steps - positions) / vectors, numpy.inf)
+    faces = numpy.zeros((n, 3), dtype=int)
+    hit = numpy.zeros(n, dtype=bool)
+    if n == 0:
+        return hit, voxels, faces
+
+    # Gather the blocks of the chunks within reach of each ray into a stack,
+    # sorted by `_chunk_key`, with an empty chunk last for the positions
+    # above or below the world. Rays far apart do not gather the chunks
+    # between them.
+    reach = numpy.linalg.norm(vectors, axis=1, keepdims=True) * max_distance + 1
+    low = numpy.floor_divide(voxels - reach, SECTOR_SIZE).astype(int)[:, [0, 2]]
+    high = numpy.floor_divide(voxels + reach, SECTOR_SIZE).astype(int)[:, [0, 2]]
+    span = numpy.arange((high - low).max() + 1)
+    chunk_x = low[:, 0, None, None] + span[None, :, None]
+    chunk_z = low[:, 1, None, None] + span[None, None, :]
+    within = (chunk_x <= high[:, 0, None, None]) & (chunk_z <= high[:, 1, None, None])
+    keys = numpy.unique(_chunk_key(*numpy.broadcast_arrays(chunk_x, chunk_z))[within])
+    blocks = numpy.zeros((len(keys) + 1, SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE), dtype=numpy.uint16)
+    for index, key in enumerate(keys.tolist()):
+        ids = world.chunk_ids((key >> 32, 0, (key & 0xffffffff) - 2 ** 31))
+        if ids is not None:
+            blocks[index] = ids
+
+    rows = numpy.arange(n)
+    while len(rows):
+        x, y, z = voxels[rows].T
+        y = y - WORLD_BOTTOM
+        index = numpy.searchsorted(keys, _chunk_key(x // SECTOR_SIZE, z // SECTOR_SIZE))
+        index[(y < 0) | (y >= WORLD_HEIGHT)] = len(blocks) - 1
+        found = blocks[index, x % SECTOR_SIZE, numpy.clip(y, 0, WORLD_HEIGHT - 1), z % SECTOR_SIZE] != 0
+        hit[rows[found]] = True
+        rows = rows[~found]
+        # Step each remaining ray into its next block:
+        axes = numpy.argmin(t_max[rows], axis=1)
+        t = t_max[rows, axes]
+        voxels[rows, axes] += steps[rows, axes]
+        t_max[rows, axes] += t_delta[rows, axes]
+        faces[rows] = 0
+        faces[rows, axes] = -steps[rows, axes]
+        rows = rows[t <= max_distance]
+    return hit, voxels, faces
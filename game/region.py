@@ -0,0 +1,277 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import struct
+import threading
+
+import numpy
+
+
+# Layout of a region file, all integers are little-endian:
+#
+#   header     HEADER, at offset 0
+#   metadata   a JSON object, encoded in UTF-8
+#   chunks     the block ids of each chunk, see `world.compress_chunk`
+#   table      an array of TABLE_ENTRY, one per chunk, sorted by sector
+#
+# The header holds the offset and length of the metadata and of the table,
+# which holds the offset and length of each chunk. A single chunk can thus
+# be read with three reads, without going through the rest of the file.
+#
+# Saving again only appends the chunks which changed, followed by a new
+# table (and new metadata, if it changed), then overwrites the header. The
+# header is written last, so a file interrupted while saving still points
+# to the previous table. The data no longer referenced is wasted until the
+# whole file is written again.
+
+MAGIC = b'TCRG'
+VERSION = 1
+
+# Magic, version, flags (unused), table offset, chunk count, metadata offset,
+# metadata length.
+HEADER = struct.Struct('<4sHHQIQI')
+
+TABLE_ENTRY = numpy.dtype([('x', '<i4'), ('z', '<i4'), ('offset', '<u8'), ('length', '<u4')])
+
+
+class RegionFormatError(Exception):
+    """Raised when a file is not a valid region file."""
+
+
+class RegionFile:
+    """Access to a region file, holding the chunks of a saved world.
+
+    Only the header, the metadata and the offset table are read when the
+    file is opened. Each chunk is read from the file when requested.
+    """
+
+    def __init__(self, path, writable=False):
+        """
+        :param path: The path of the region file.
+        :param writable: Whether or not chunks will be appended to the file.
+        """
+        self.path = path
+        self._mode = 'r+b' if writable else 'rb'
+        self._file = open(path, self._mode)
+        # Chunks may be read from several threads.
+        self._lock = threading.Lock()
+        try:
+            self._read_header()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_header(self):
+        table_offset, count, meta_offset, meta_length = _read_header(self._file, self.path)
+        self._file.seek(meta_offset)
+        self.metadata = json.loads(self._file.read(meta_length).decode('utf-8'))
+        self._meta_offset = meta_offset
+        self._meta_length = meta_length
+
+        self._file.seek(table_offset)
+        table = numpy.frombuffer(self._file.read(count * TABLE_ENTRY.itemsize), dtype=TABLE_ENTRY)
+        if len(table) != count:
+            raise RegionFormatError("Truncated region file: {}".format(self.path))
+        # Mapping from sector to the (offset, length) of its chunk.
+        self._table = {(x, 0, z): (offset, length) for x, z, offset, length in table.tolist()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def reload(self, replacement=None):
+        """Read the header of the file again, after chunks have been appended
+        to it through another `RegionFile`.
+
+        :param replacement: The path of a region file to rename over this one
+                            first, see `write_region`. The file is closed in
+                            the meantime, as an open file cannot be replaced
+                            on Windows.
+        """
+        with self._lock:
+            if replacement is not None:
+                self._file.close()
+                try:
+                    os.replace(replacement, self.path)
+                finally:
+                    self._file = open(self.path, self._mode)
+            self._read_header()
+
+    def __len__(self):
+        return len(self._table)
+
+    def __iter__(self):
+        return iter(self._table)
+
+    def __contains__(self, sector):
+        return sector in self._table
+
+    @property
+    def size(self):
+        """The size of the file, in bytes."""
+        return self._file.seek(0, 2)
+
+    @property
+    def wasted(self):
+        """The number of bytes of the file no longer referenced."""
+        live = HEADER.size + self._meta_length + len(self._table) * TABLE_ENTRY.itemsize
+        live += sum(length for _, length in self._table.values())
+        return self.size - live
+
+    def read(self, sector):
+        """Return the compressed block ids of the chunk of `sector`, see
+        `world.decompress_chunk`.
+
+        :raise KeyError: If the file has no chunk for this sector.
+        """
+        with self._lock:
+            offset, length = self._table[sector]
+            self._file.seek(offset)
+            data = self._file.read(length)
+        if len(data) != length:
+            raise RegionFormatError("Truncated region file: {}".format(self.path))
+        return data
+
+    def append(self, chunks, metadata):
+        """Save chunks to the file, replacing the ones of the same sectors.
+
+        :param chunks: Mapping from sector to the compressed block ids of its
+                       chunk, see `world.compress_chunk`.
+        :param metadata: A dict of JSON serializable values, describing the
+                         world.
+        """
+        file = self._file
+        file.seek(0, 2)
+        for sector, data in chunks.items():
+            self._table[sector] = file.tell(), len(data)
+            file.write(data)
+        if metadata != self.metadata:
+            meta = json.dumps(metadata).encode('utf-8')
+            self._meta_offset, self._meta_length = file.tell(), len(meta)
+            self.metadata = metadata
+            file.write(meta)
+        table_offset = file.tell()
+        file.write(_pack_table(self._table))
+        # Everything the new header points to must be on disk before it.
+        file.flush()
+        os.fsync(file.fileno())
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, table_offset, len(self._table),
+                               self._meta_offset, self._meta_length))
+        file.flush()
+
+
+def _read_header(file, path):
+    """Read and check the header of a region file.
+
+    :return: The (table offset, chunk count, metadata offset, metadata
+             length) tuple.
+    """
+    file.seek(0)
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise RegionFormatError("Truncated region file: {}".format(path))
+    magic, version, _, table_offset, count, meta_offset, meta_length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise RegionFormatError("Not a region file: {}".format(path))
+    if version != VERSION:
+        raise RegionFormatError("Unsupported region file version: {}".format(version))
+    return table_offset, count, meta_offset, meta_length
+
+
+def read_metadata(path):
+    """Return the metadata of a region file, without reading its offset
+    table nor its chunks.
+    """
+    with open(path, 'rb') as file:
+        _, _, meta_offset, meta_length = _read_header(file, path)
+        file.seek(meta_offset)
+        return json.loads(file.read(meta_length).decode('utf-8'))
+
+
+def _pack_table(table):
+    """Return the bytes of the offset table, from a mapping from sector to
+    the (offset, length) of its chunk.
+    """
+    sectors = sorted(table, key=lambda sector: (sector[0], sector[2]))
+    entries = numpy.zeros(len(sectors), dtype=TABLE_ENTRY)
+    entries['x'] = [sector[0] for sector in sectors]
+    entries['z'] = [sector[2] for sector in sectors]
+    entries['offset'] = [table[sector][0] for sector in sectors]
+    entries['length'] = [table[sector][1] for sector in sectors]
+    return entries.tobytes()
+
+
+def write_region(path, chunks, metadata, rename=True):
+    """Write a region file, replacing any existing file.
+
+    The file is written under a temporary name, then renamed: until it is
+    complete, the previous file stays in place.
+
+    :param path: The path of the region file.
+    :param chunks: Mapping from sector to the compressed block ids of its
+                   chunk, see `world.compress_chunk`.
+    :param metadata: A dict of JSON serializable values, describing the world.
+    :param rename: Whether or not to rename the file. If not, the caller
+                   renames it, e.g. with `RegionFile.reload`.
+    :return: The path the file was written to.
+    """
+    table = {}
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(bytes(HEADER.size))
+        meta = json.dumps(metadata).encode('utf-8')
+        meta_offset = file.tell()
+        file.write(meta)
+        for sector, data in chunks.items():
+            table[sector] = file.tell(), len(data)
+            file.write(data)
+        table_offset = file.tell()
+        file.write(_pack_table(table))
+        # The header goes last, once all the offsets are known.
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, table_offset, len(table), meta_offset, len(meta)))
+        file.flush()
+        os.fsync(file.fileno())
+    if not rename:
+        return temp_path
+    os.replace(temp_path, path)
+    return path
@@ -0,0 +1,368 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import itertools
+import time
+import numpy
+import pyglet
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pyglet.gl import *
+from pyglet.graphics.vertexbuffer import IndirectArrayRegion
+
+from .blocks import FACES
+from .config import *
+from .frustum import visible_sectors
+from .mesher import mesh_padded, padded_ids
+from .scheduler import WorkQueue
+from .utilities import ring_offsets, sectorize
+
+
+def _copy_array(array, data):
+    """ Copy a NumPy array into the data of an attribute of a vertex list,
+    e.g. `vertex_list.vertices`, without converting it to a list.
+
+    """
+    if isinstance(array, IndirectArrayRegion):
+        # The attributes are interleaved in the buffer: `array.count` values,
+        # then the other attributes, up to `array.stride` values.
+        buffer = numpy.ctypeslib.as_array(array.region.array)
+        itemsize = buffer.itemsize
+        array = numpy.lib.stride_tricks.as_strided(buffer, shape=(len(data) // array.count, array.count),
+                                                   strides=(array.stride * itemsize, itemsize))
+        array[:] = data.reshape(array.shape)
+    else:
+        numpy.ctypeslib.as_array(array)[:] = data
+
+class WorldRenderer(object):
+    def __init__(self, model, group, tile_groups=None):
+        """Draws the blocks of a `model.Model` around the player.
+
+        The renderer observes the model: the meshes of the sectors are
+        rebuilt when their blocks change.
+
+        :param model: The `Model` to draw.
+        :param group: The `graphics.BlockGroup` to draw the blocks with.
+        :param tile_groups: Groups binding a repeatable texture per atlas
+                            tile, used to draw the meshes built with greedy
+                            meshing (see `graphics.create_tile_groups`).
+        """
+        self.model = model
+        self.group = group
+        self.tile_groups = tile_groups
+
+        # The set of sectors that are shown.
+        self.shown = set()
+
+        # The sector the player is in, and the number of sectors shown around.
+        self.sector = None
+        self.set_render_distance(RENDER_DISTANCE)
+
+        # Mapping from sector to a list of pyglet `VertexList` holding the
+        # mesh of all the visible block faces of the sector. There is a single
+        # one, unless greedy meshing draws each texture separately.
+        self._shown = {}
+
+        # Mapping from sector to the pyglet `Batch` holding its vertex lists.
+        # Each sector has its own batch, so sectors out of the field of view
+        # can be skipped when drawing.
+        self._batches = {}
+
+        # Queue of deferred calls to _show_sector() and _hide_sector(), run
+        # from the nearest sector to the furthest one.
+        self.queue = WorkQueue()
+
+        # Sector meshes are built by worker threads, from a copy of the block
+        # ids. The main thread only uploads the results to the batch.
+        self._executor = ThreadPoolExecutor(max_workers=MESH_WORKERS)
+
+        # Meshes being built, as a list of (sector, version, future).
+        self._meshing = []
+
+        # Mapping from sector to the version of the last mesh requested for
+        # it. A built mesh with another version is outdated and is dropped.
+        self._versions = {}
+        self._next_version = itertools.count()
+
+        model.add_observer(self)
+
+    @property
+    def currently_shown(self):
+        """The number of block faces drawn to the canvas."""
+        return sum(vertex_list.get_size() for vertex_lists in self._shown.values()
+                   for vertex_list in vertex_lists) // 4
+
+    def on_block_changed(self, position, immediate):
+        """Event handler for the Model.on_block_changed event.
+
+        Rebuilds the meshes around the block right away if `immediate`.
+        """
+        if immediate:
+            self.check_neighbors(position)
+
+    def on_sectors_changed(self, sectors):
+        """Event handler for the Model.on_sectors_changed event.
+
+        Queues a new mesh for the shown sectors among `sectors` and their
+        neighbors, as the faces on their borders may have changed.
+        """
+        refresh = set()
+        for x, y, z in sectors:
+            refresh.update(((x, y, z), (x - 1, y, z), (x + 1, y, z), (x, y, z - 1), (x, y, z + 1)))
+        for sector in refresh & self.shown:
+            self._enqueue(sector, self._show_sector, sector)
+
+    def on_chunk_evicted(self, sector):
+        """Event handler for the Model.on_chunk_evicted event."""
+        if sector in self.shown:
+            self.hide_sector(sector, immediate=True)
+
+    def check_neighbors(self, position):
+        """ Rebuild the mesh of the shown sectors containing `position` or one
+        of its neighbors, so that the visibility of each of their faces is
+        current. Usually used after a block is added or removed.
+
+        """
+        x, y, z = position
+        sectors = {sectorize((x + dx, y + dy, z + dz)) for dx, dy, dz in FACES}
+        for sector in sectors:
+            if sector in self.shown:
+                self._mesh_sector(sector)
+
+    def show_sector(self, sector, immediate=False):
+        """ Ensure all blocks in the given sector that should be shown are
+        drawn to the canvas.
+
+        Parameters
+        ----------
+        sector : tuple of len 3
+            The sector to show.
+        immediate : bool
+            Whether or not to show the sector immediately.
+
+        """
+        self.shown.add(sector)
+        if immediate:
+            self._mesh_sector(sector)
+        else:
+            self._enqueue(sector, self._show_sector, sector)
+
+    def _show_sector(self, sector):
+        """ Private implementation of the `show_sector()` method. Starts
+        building the mesh of the sector in a worker thread. It is uploaded by
+        `process_queue()` once ready.
+
+        """
+        version = self._versions[sector] = next(self._next_version)
+        padded = padded_ids(self.model.world, sector)
+        future = self._executor.submit(mesh_padded, padded, sector, self.tile_groups is not None)
+        self._meshing.append((sector, version, future))
+
+    def _mesh_sector(self, sector):
+        """ Build the mesh of the sector and upload it immediately. Any mesh
+        of the sector still being built in the background is outdated.
+
+        """
+        version = self._versions[sector] = next(self._next_version)
+        padded = padded_ids(self.model.world, sector)
+        self._upload_sector(sector, version, mesh_padded(padded, sector, self.tile_groups is not None))
+
+    def _upload_sector(self, sector, version, mesh):
+        """ Replace the vertex lists of the sector by the given `mesh`, as
+        returned by `mesher.build_sector_mesh()`. The mesh is dropped if it
+        is outdated or if the sector has been hidden in the meantime.
+
+        """
+        if self._versions.get(sector) != version or sector not in self.shown:
+            return
+        for vertex_list in self._shown.pop(sector, []):
+            vertex_list.delete()
+        batch = self._batches.setdefault(sector, pyglet.graphics.Batch())
+        vertex_lists = []
+        for tile, vertices, tex_coords in mesh:
+            if not len(vertices):
+                continue
+            group = self.group if tile is None else self.tile_groups[tile]
+            vertex_list = batch.add(len(vertices) // 3, GL_QUADS, group, 'v3f/static', 't2f/static')
+            _copy_array(vertex_list.vertices, vertices)
+            _copy_array(vertex_list.tex_coords, tex_coords)
+            vertex_lists.append(vertex_list)
+        if vertex_lists:
+            self._shown[sector] = vertex_lists
+        else:
+            del self._batches[sector]
+
+    def hide_sector(self, sector, immediate=False):
+        """ Ensure all blocks in the given sector that should be hidden are
+        removed from the canvas.
+
+        Parameters
+        ----------
+        sector : tuple of len 3
+            The sector to hide.
+        immediate : bool
+            Whether or not to hide the sector immediately.
+
+        """
+        self.shown.discard(sector)
+        if immediate:
+            self._hide_sector(sector)
+        else:
+            self._enqueue(sector, self._hide_sector, sector)
+
+    def _hide_sector(self, sector):
+        """ Private implementation of the 'hide_sector()` method.
+
+        """
+        # Drop any mesh of the sector still being built.
+        self._versions.pop(sector, None)
+        for vertex_list in self._shown.pop(sector, []):
+            vertex_list.delete()
+        self._batches.pop(sector, None)
+
+    def draw(self, position, rotation, aspect):
+        """ Draw the shown sectors which are in the field of view of the
+        camera. Sectors entirely out of the view frustum are skipped.
+
+        Parameters
+        ----------
+        position : tuple of len 3
+            The (x, y, z) position of the camera.
+        rotation : tuple of len 2
+            The (horizontal, vertical) rotation of the camera, in degrees.
+        aspect : float
+            The aspect ratio (width / height) of the viewport.
+
+        """
+        for sector in visible_sectors(self._batches, position, rotation, aspect):
+            self._batches[sector].draw()
+
+    def set_render_distance(self, distance):
+        """ Set the number of sectors shown around the player. Sectors are
+        only hidden once further than `distance + UNLOAD_MARGIN`, so that
+        walking back and forth across a sector boundary does not keep hiding
+        and showing the same sectors.
+
+        """
+        self.render_distance = max(1, distance)
+        self._show_offsets = ring_offsets(self.render_distance)
+        self._unload_distance = self.render_distance + UNLOAD_MARGIN
+        # The meshes of the shown sectors need the blocks of their neighbors.
+        self.model.set_load_distance(self.render_distance + 1)
+        if self.sector is not None:
+            self.change_sectors(self.sector)
+
+    def change_sectors(self, after, motion=(0, 0, 0)):
+        """ Move to sector `after`. A sector is a contiguous x, y sub-region
+        of world. Sectors are used to speed up world rendering.
+
+        Parameters
+        ----------
+        after : tuple of len 3
+            The sector the player is in.
+        motion : tuple of len 3
+            The motion vector of the player. The sectors around where the
+            player is heading to are shown in advance.
+
+        """
+        self.sector = after
+        self.queue.set_center(after)
+        x, y, z = after
+        dx, dy, dz = motion
+        ahead_x = x + int(round(dx * PREFETCH_DISTANCE))
+        ahead_z = z + int(round(dz * PREFETCH_DISTANCE))
+        wanted = [(x + ox, y, z + oz) for ox, _, oz in self._show_offsets]
+        prefetch = [(ahead_x + ox, y, ahead_z + oz) for ox, _, oz in self._show_offsets]
+        for sector in wanted + prefetch:
+            if sector not in self.shown:
+                self.show_sector(sector)
+        prefetch = set(prefetch)
+        limit = (self._unload_distance + 1) ** 2
+        for sector in list(self.shown):
+            if sector in prefetch:
+                continue
+            sx, _, sz = sector
+            if (sx - x) ** 2 + (sz - z) ** 2 > limit:
+                self.hide_sector(sector)
+
+    def _enqueue(self, sector, func, *args):
+        """ Add `func` to the internal queue, replacing any call pending on
+        the same `sector`.
+
+        """
+        self.queue.push(sector, func, *args)
+
+    def process_queue(self):
+        """ Upload the built meshes and process the queue, within a time
+        budget of `MESH_FRAME_BUDGET` per call. This allows the game loop to
+        run smoothly. The queue contains calls to _show_sector() and
+        _hide_sector() so this method should be called after change_sectors()
+
+        """
+        deadline = time.perf_counter() + MESH_FRAME_BUDGET
+        self._upload_meshes(deadline=deadline)
+        self.queue.run(budget=max(0.0, deadline - time.perf_counter()))
+
+    def _upload_meshes(self, deadline=None):
+        """ Upload the sector meshes built by the worker threads.
+
+        Parameters
+        ----------
+        deadline : float
+            Leave the remaining meshes for later once `time.perf_counter()`
+            reaches this time. At least one mesh is uploaded. By default, all
+            the meshes are.
+
+        """
+        pending = []
+        uploaded = False
+        for sector, version, future in self._meshing:
+            if uploaded and deadline is not None and time.perf_counter() >= deadline:
+                pending.append((sector, version, future))
+            elif future.done():
+                self._upload_sector(sector, version, future.result())
+                uploaded = True
+            else:
+                pending.append((sector, version, future))
+        self._meshing = pending
+
+    def close(self):
+        """ Stop the worker threads building the meshes.
+
+        """
+        for _, _, future in self._meshing:
+            future.cancel()
+        self._meshing = []
+        self._executor.shutdown()
@@ -31,27 +31,48 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import pyglet
 import pickle
 import json
 import os
+import time
+import base64
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from time import gmtime, strftime
 
+from .blocks import BLOCKS
+from .config import JOURNAL_FLUSH_INTERVAL
+from .genworld import create_generator
+from .journal import Journal, read_journal
+from .region import RegionFile, read_metadata, write_region
+from .utilities import get_settings_path
+from .world import ChunkStore, compress_chunk
+
+
+# Version of the world metadata, saved in the region files.
+METADATA_VERSION = 1
+
 
 class SaveManager(object):
-    def __init__(self):
+    def __init__(self, save_path=None):
         """SaveManager handles saving/loading of worlds and options.
 
         An internal dictionary (self._data) holds persistent data
         such as options, inventory, etc. To make accessing this easier,
         the "magic methods" `__getitem__` and `__setitem__` are used to
         add dictionary-like behavior to `SaveManager`.
+
+        :param save_path: The directory of the saves, by default the OS
+                          specific settings directory.
         """
 
         # Get the appropriate OS specific save path:
-        self.save_path = pyglet.resource.get_settings_path('TerraCraft')
-        self.save_file = 'saveworld{}.dat'
+        self.save_path = save_path or get_settings_path('TerraCraft')
+        self.save_file = 'saveworld{}.region'
+        # Worlds saved by older versions, with pickle:
+        self.legacy_save_file = 'saveworld{}.dat'
+        # Block edits made since the last save (see `journal.Journal`):
+        self.journal_file = 'saveworld{}.journal'
         self.config_file = 'config.json'
         self.save_slot = 0
 
@@ -59,37 +80,197 @@ class SaveManager(object):
                       'options': {},
                       'inventory': {}}
 
+        # Worlds are compressed and written by a worker thread. Saves are run
+        # one after the other, in order: each one is only submitted once the
+        # previous one has been completed by `poll`, which may rename the file.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Saves in progress, as a list of [future (None until submitted),
+        # arguments of `_write_world`, model, path, saved sectors, journal,
+        # mark of the journal when the save started].
+        self._saves = []
+        # The fraction of the current save done, None when not saving.
+        self.progress = None
+        # The (model, path) of the last world loaded or saved. Its next saves
+        # only need to write the chunks modified in the meantime.
+        self._saved = None
+
+        # The metadata of the last world loaded or saved, see `save_world`.
+        self.world_metadata = {}
+
+        # Whether the last load failed. The save is then kept as it is,
+        # rather than replaced by the new map.
+        self.load_failed = False
+
+        # The journal of the block edits of the player, open once the world
+        # has been loaded or saved.
+        self.journal = None
+        self._flush_time = time.perf_counter()
+
     @staticmethod
     def timestamp_print(txt):
         print((strftime("%d-%m-%Y %H:%M:%S | ", gmtime()) + str(txt)))
 
     def has_save_game(self):
         """Returns True if the save path and file exist."""
-        save_file = self.save_file.format(self.save_slot)
-        return os.path.exists(os.path.join(self.save_path, save_file))
+        for save_file in (self.save_file, self.legacy_save_file):
+            if os.path.exists(os.path.join(self.save_path, save_file.format(self.save_slot))):
+                return True
+        return False
+
+    def read_save_info(self):
+        """Return the metadata of the world saved in the current slot (see
+        `save_world`), without loading the world. Returns None if there is
+        no save, or if it has no metadata.
+        """
+        try:
+            return read_metadata(os.path.join(self.save_path, self.save_file.format(self.save_slot)))
+        except Exception:
+            return None
+
+    @staticmethod
+    def decode_thumbnail(metadata):
+        """Return the (width, height, RGB data) of the thumbnail of a save
+        from its metadata, or None if it has no thumbnail.
+        """
+        thumbnail = metadata.get('thumbnail')
+        if thumbnail is None:
+            return None
+        return thumbnail['width'], thumbnail['height'], base64.b64decode(thumbnail['data'])
 
     def load_world(self, model):
-        save_file = self.save_file.format(self.save_slot)
-        save_file_path = os.path.join(self.save_path, save_file)
+        save_file_path = os.path.join(self.save_path, self.save_file.format(self.save_slot))
         self.timestamp_print('start loading...')
+        start = time.perf_counter()
 
+        self.world_metadata = {}
+        self.load_failed = False
         try:
-            with open(save_file_path, 'rb') as file:
-                loaded_world = pickle.load(file)
-
-            for position, block in loaded_world.items():
-                if block.name == "dirt_with_grass":
-                    model.add_block(position, block, immediate=True)
-                else:
-                    model.add_block(position, block, immediate=False)
+            if not os.path.exists(save_file_path):
+                self._load_legacy_world(model)
+            else:
+                self._load_region_world(model, save_file_path)
 
-            self.timestamp_print('Loading completed.')
+            self.timestamp_print('Loading completed in {:.1f} ms.'.format(1000 * (time.perf_counter() - start)))
             return True
         except:     # If loading fails for ANY reason, return False
             self.timestamp_print('Loading failed! Generating a new map.')
+            # Forget whatever was loaded. The save is left untouched: the new
+            # map is not saved over it.
+            model.clear()
+            self._saved = None
+            self.world_metadata = {}
+            self.load_failed = True
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
             return False
 
-    def save_world(self, model):
+    def _load_region_world(self, model, save_file_path):
+        """Load a world saved in a region file, then apply the block edits
+        made since it was saved and open the journal to record the next ones.
+        The model is only changed once the file and the journal have been
+        read.
+        """
+        region = RegionFile(save_file_path)
+        try:
+            generator = region.metadata.get('generator')
+            if generator is not None:
+                generator = create_generator(generator, region.metadata['seed'])
+            journal_file_path = os.path.join(self.save_path, self.journal_file.format(self.save_slot))
+            positions, ids = [], []
+            if os.path.exists(journal_file_path):
+                positions, ids = read_journal(journal_file_path)
+                for block_id in set(ids.tolist()) - {0}:
+                    BLOCKS[block_id]    # Raises an IndexError or a KeyError for unknown blocks.
+        except:
+            region.close()
+            raise
+
+        model.generator = generator
+        # Only the modified chunks are saved, the others are generated
+        # again from the generator and its seed. No chunk is read yet:
+        # the model reads them from the region file as the player
+        # approaches them, starting with the ones around the player.
+        model.modified.update(region)
+        model.set_region(region, set(region))
+        model.dirty.clear()
+        if len(ids):
+            self.timestamp_print('replaying {} edits...'.format(len(ids)))
+            model.add_blocks(positions, ids)
+        self.world_metadata = region.metadata
+        self._saved = model, save_file_path
+        self._open_journal(journal_file_path)
+
+    def _open_journal(self, journal_file_path):
+        if self.journal is not None:
+            if self.journal.path == journal_file_path:
+                return
+            self.journal.close()
+        self.journal = Journal(journal_file_path)
+
+    def flush_journal(self):
+        """Write the recent edits to the journal right away."""
+        if self.journal is not None:
+            self.journal.flush()
+        self._flush_time = time.perf_counter()
+
+    def record_edit(self, position, block):
+        """Record a block edit of the player in the journal.
+
+        :param position: The (x, y, z) position of the edited block.
+        :param block: The new Block, None if it was removed.
+        """
+        if self.journal is not None:
+            self.journal.record(position, 0 if block is None else block.id)
+
+    def _load_legacy_world(self, model):
+        """Load a world pickled by an older version."""
+        save_file_path = os.path.join(self.save_path, self.legacy_save_file.format(self.save_slot))
+        with open(save_file_path, 'rb') as file:
+            loaded_world = pickle.load(file)
+
+        if isinstance(loaded_world, ChunkStore):
+            for sector in loaded_world.chunks:
+                model.add_blocks(*loaded_world.arrays(sector))
+        else:
+            # A dict of Blocks.
+            positions = list(loaded_world.keys())
+            ids = [BLOCKS.by_name[block.name].id for block in loaded_world.values()]
+            model.add_blocks(positions, ids)
+
+    def save_world(self, model, player=None, play_time=0, thumbnail=None):
+        """Start saving the world in the background.
+
+        Only a snapshot of the chunks to save is taken right away: the
+        compression and the writing happen in a worker thread, while the
+        game goes on. Call `poll()` regularly to complete the saves.
+
+        Besides the chunks, the save holds metadata about the world, which
+        `read_save_info` reads without loading the world: the version of the
+        metadata, the generator and its seed, the number of saved chunks, the
+        number of blocks in the chunks loaded around the player (not in the
+        whole world), the player state, the play time, the creation and save
+        times (in seconds since the epoch), and a thumbnail.
+
+        :param model: The `Model` of the world to save.
+        :param player: A dict of JSON serializable values describing the
+                       player, e.g. its position, restored when loading.
+        :param play_time: float: The total time played in this world, in seconds.
+        :param thumbnail: The (width, height, RGB data) of a small picture of
+                          the world, see `graphics.capture_thumbnail`.
+        :return: Whether or not the save was started. It is not if the save
+                 of the current slot failed to load, even partly, as it must
+                 not be overwritten.
+        """
+        if model.unreadable and not self.load_failed:
+            # Chunks are read as the player approaches them: the load may
+            # only fail now.
+            self.timestamp_print('Loading failed! Could not read the chunks of {} sectors.'.format(
+                len(model.unreadable)))
+            self.load_failed = True
+        if self.load_failed:
+            self.timestamp_print('not saving over a save which failed to load')
+            return False
         save_file = self.save_file.format(self.save_slot)
         save_file_path = os.path.join(self.save_path, save_file)
         self.timestamp_print('start saving...')
@@ -98,13 +279,140 @@ class SaveManager(object):
         if not os.path.exists(self.save_path):
             self.timestamp_print(
                 'creating directory: {}'.format(self.save_path))
-            os.mkdir(self.save_path)
+            os.makedirs(self.save_path)
+
+        # Only the chunks modified since the last save are written, unless the
+        # file holds another world (or nothing yet).
+        incremental = self._saved == (model, save_file_path)
+
+        now = time.time()
+        metadata = {'version': METADATA_VERSION,
+                    'chunks': len(model.modified),
+                    'loaded_blocks': len(model.world),
+                    'player': player,
+                    'play_time': play_time,
+                    'created': self.world_metadata.get('created', now) if incremental else now,
+                    'saved': now}
+        if model.generator is not None:
+            metadata['generator'] = model.generator.name
+            metadata['seed'] = model.generator.seed
+        if thumbnail is not None:
+            width, height, data = thumbnail
+            metadata['thumbnail'] = {'width': width, 'height': height,
+                                     'data': base64.b64encode(data).decode('ascii')}
+        self.world_metadata = metadata
+        dirty = set(model.dirty)
+        snapshot = model.snapshot_chunks(dirty if incremental else None)
+        model.dirty.clear()
+        self._saved = model, save_file_path
+
+        # The edits recorded so far are all in the snapshot: they are dropped
+        # from the journal once the save completes. Until then, they can still
+        # be replayed on the previous save.
+        self._open_journal(os.path.join(self.save_path, self.journal_file.format(self.save_slot)))
+        mark = self.journal.mark()
 
-        # Efficiently save the world to a binary file
-        with open(save_file_path, 'wb') as file:
-            pickle.dump(model.world, file)
+        arguments = save_file_path, snapshot, metadata, incremental
+        self._saves.append([None, arguments, model, save_file_path, set(snapshot), self.journal, mark])
+        self._submit_save()
+        return True
 
-        self.timestamp_print('saving completed')
+    def _submit_save(self):
+        """Submit the first save in progress to the worker thread, unless it
+        already is.
+        """
+        if self._saves and self._saves[0][0] is None:
+            self._saves[0][0] = self._executor.submit(self._write_world, *self._saves[0][1])
+
+    def _write_world(self, save_file_path, snapshot, metadata, incremental):
+        """Write a snapshot of the world to its region file. Runs in the
+        worker thread.
+
+        :return: The path of the new file to rename over the region file, see
+                 `poll`, or None if the chunks were appended to it.
+        """
+        self.progress = 0.0
+        chunks = {}
+        for sector, blocks in snapshot.items():
+            if isinstance(blocks, RegionFile):
+                # Unchanged since it was saved. The file is only replaced
+                # once this save completes, see `poll`.
+                blocks = blocks.read(sector)
+            elif not isinstance(blocks, bytes):
+                blocks = compress_chunk(blocks.ids())
+            chunks[sector] = blocks
+            self.progress = len(chunks) / (len(snapshot) + 1)
+
+        if incremental:
+            with RegionFile(save_file_path, writable=True) as region:
+                if region.wasted <= region.size // 2:
+                    region.append(chunks, metadata)
+                    return None
+                # The file is mostly made of replaced chunks: write it again,
+                # with the chunks which did not change since the last save.
+                for sector in region:
+                    if sector not in chunks:
+                        chunks[sector] = region.read(sector)
+        return write_region(save_file_path, chunks, metadata, rename=False)
+
+    @property
+    def saving(self):
+        """Whether or not a save is in progress."""
+        return bool(self._saves)
+
+    def poll(self):
+        """Complete the saves which are done, and write the recent edits to
+        the journal. Must be called regularly from the main thread, e.g. once
+        per frame.
+        """
+        if time.perf_counter() - self._flush_time >= JOURNAL_FLUSH_INTERVAL:
+            self.flush_journal()
+
+        while self._saves and self._saves[0][0].done():
+            future, _, model, save_file_path, sectors, journal, mark = self._saves.pop(0)
+            try:
+                temp_path = future.result()
+                # The file is replaced here rather than by the worker, as the
+                # region file of the model must be closed meanwhile.
+                region = model.region
+                if region is not None and region.path == save_file_path:
+                    region.reload(temp_path)
+                else:
+                    if temp_path is not None:
+                        os.replace(temp_path, save_file_path)
+                    region = RegionFile(save_file_path)
+            except Exception as error:
+                # The chunks were not saved: save them again next time, along
+                # with everything else as the file may have been altered.
+                model.dirty.update(sectors)
+                self._saved = None
+                self.timestamp_print('saving failed: {}'.format(error))
+            else:
+                # The model can now read the saved chunks back from the file,
+                # unless they changed since, or a later save changes them.
+                for _, _, later_model, _, later_sectors, _, _ in self._saves:
+                    if later_model is model:
+                        sectors -= later_sectors
+                model.set_region(region, sectors)
+                # The save now holds the edits of the journal up to the mark.
+                if journal is self.journal:
+                    journal.truncate(mark)
+                self.timestamp_print('saving completed')
+            self._submit_save()
+        if not self._saves:
+            self.progress = None
+
+    def close(self):
+        """Wait for the saves in progress to complete, then close the
+        journal and stop the worker thread.
+        """
+        while self._saves:
+            wait([self._saves[0][0]])
+            self.poll()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self._executor.shutdown()
 
     def __getitem__(self, item):
         return self._data.get(item)
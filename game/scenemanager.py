@@ -58,6 +58,9 @@ class SceneManager:
         # Activate the Menu Scene
         self.change_scene("MenuScene")
 
+        # Handle the closing of the window, whichever Scene is active:
+        self.window.push_handlers(on_close=self.on_close)
+
     def add_scene(self, scene_instance):
         """Add a Scene instance to the manager.
 
@@ -89,3 +92,14 @@ class SceneManager:
         :param dt: float: The change in time since the last call.
         """
         self.current_scene.update(dt)
+
+    def on_close(self):
+        """Event handler for the Window.on_close event.
+
+        Called when the game is closed: the saves in progress are completed,
+        the last edits are written to the journal, then the Scenes release
+        their resources.
+        """
+        self.save.close()
+        for scene in self.scenes.values():
+            scene.close()
@@ -44,9 +44,12 @@ from pyglet.sprite import Sprite
 from pyglet.graphics import OrderedGroup
 
 from .blocks import *
+from .collision import player_box, sweep
 from .utilities import *
-from .graphics import BlockGroup
+from .graphics import BlockGroup, capture_thumbnail, create_tile_groups
 from .genworld import *
+from .model import Model
+from .renderer import WorldRenderer
 
 class AudioEngine:
     """A high level audio engine for easily playing SFX and Music."""
@@ -108,6 +111,11 @@ class Scene:
     def update(self, dt):
         raise NotImplementedError
 
+    def close(self):
+        """Release the resources of the Scene, when the game is closed,
+        whether or not the Scene is active.
+        """
+
 
 class MenuScene(Scene):
     def __init__(self, window):
@@ -127,17 +135,30 @@ class MenuScene(Scene):
 
         # Create labels for three save slots:
         self.save_slot_labels = []
+        self.save_slot_thumbnails = []
         for save_slot in [1, 2, 3]:
             self.scene_manager.save.save_slot = save_slot
             # indicate if an existing save exists
+            info = None
             if self.scene_manager.save.has_save_game():
                 label_text = f"{save_slot}:  load"
+                # Only the metadata of the save is read, not the world.
+                info = self.scene_manager.save.read_save_info()
+                if info is not None:
+                    label_text += self._describe_save(info)
             else:
                 label_text = f"{save_slot}:  new game"
             y_pos = 190 - 50 * save_slot
             label = pyglet.text.Label(
                 label_text, font_size=20, x=40, y=y_pos, batch=self.batch)
             self.save_slot_labels.append(label)
+            thumbnail = info and self.scene_manager.save.decode_thumbnail(info)
+            if thumbnail:
+                width, height, data = thumbnail
+                image = pyglet.image.ImageData(width, height, 'RGB', data)
+                sprite = Sprite(img=image, x=label.x + label.content_width + 15, y=y_pos - 5,
+                                batch=self.batch)
+                self.save_slot_thumbnails.append(sprite)
 
         # Highlight the default save slot
         self.scene_manager.save.save_slot = 1
@@ -146,6 +167,18 @@ class MenuScene(Scene):
     def update(self, dt):
         pass
 
+    @staticmethod
+    def _describe_save(info):
+        """Return a short description of a save from its metadata."""
+        text = ''
+        if 'generator' in info:
+            text += f"  -  {info['generator']} world"
+        minutes = int(info.get('play_time', 0)) // 60
+        text += f"  -  played {minutes // 60}h{minutes % 60:02d}"
+        if 'saved' in info:
+            text += time.strftime("  -  %d-%m-%Y %H:%M", time.localtime(info['saved']))
+        return text
+
     def _highlight_save_slot(self):
         # First reset all labels to white
         for label in self.save_slot_labels:
@@ -227,6 +260,12 @@ class GameScene(Scene):
         # that, perhaps unlike in math class, the y-axis is the vertical axis.
         self.position = (0, 0, 0)
 
+        # The position at the previous simulation tick, and the time elapsed
+        # since the last tick, not simulated yet. The camera is drawn between
+        # the two positions, so that motion looks smooth at any frame rate.
+        self.previous_position = self.position
+        self.tick_time = 0
+
         # First element is rotation of the player in the x-z plane (ground
         # plane) measured from the z-axis down. The second is the rotation
         # angle from the ground plane up. Rotation is in degrees.
@@ -253,7 +292,11 @@ class GameScene(Scene):
                          key._6, key._7, key._8, key._9, key._0]
 
         # Instance of the model that handles the world.
-        self.model = Model(batch=self.batch, group=self.block_group)
+        tile_groups = None
+        if GREEDY_MESHING:
+            tile_groups = create_tile_groups(self.block_group.texture, ATLAS_SIZE, self.block_group)
+        self.model = Model()
+        self.renderer = WorldRenderer(self.model, self.block_group, tile_groups)
 
         # The crosshairs at the center of the screen.
         self.reticle = self.batch.add(4, GL_LINES, self.hud_group, 'v2i', ('c3B', [0]*12))
@@ -262,6 +305,12 @@ class GameScene(Scene):
         indices = [0, 1, 1, 2, 2, 3, 3, 0, 4, 7, 7, 6, 6, 5, 5, 4, 0, 4, 1, 7, 2, 6, 3, 5]
         self.highlight = self.batch.add_indexed(24, GL_LINES, self.block_group, indices,
                                                 'v3f/dynamic', ('c3B', [0]*72))
+        self.highlighted = None
+
+        # The result of the last line of sight search, and the pose of the
+        # player and version of the world it was computed for.
+        self._focus = None, None
+        self._focus_key = None
 
         # The label that is displayed in the top left of the canvas.
         self.info_label = pyglet.text.Label('', font_name='Arial', font_size=INFO_LABEL_FONTSIZE,
@@ -271,6 +320,16 @@ class GameScene(Scene):
         # Boolean whether to display loading screen.
         self.initialized = False
 
+        # Time since the world was last saved, in seconds.
+        self.autosave_time = 0
+
+        # Whether to save the world once the next frame is drawn, so that the
+        # save holds a thumbnail of it.
+        self.save_requested = False
+
+        # Total time played in this world, in seconds.
+        self.play_time = 0
+
         # Some environmental SFX to preload:
         self.jump_sfx = pyglet.resource.media('jump.wav', streaming=False)
         self.destroy_sfx = pyglet.resource.media('dirt.wav', streaming=False)
@@ -285,6 +344,40 @@ class GameScene(Scene):
         self.window.set_exclusive_mouse(exclusive)
         self.exclusive = exclusive
 
+    def save_world(self, thumbnail=None):
+        """ Start saving the world in the background, along with the state
+        of the player.
+
+        Parameters
+        ----------
+        thumbnail : tuple or None
+            The (width, height, RGB data) of a picture of the world.
+
+        """
+        player = {'position': self.position,
+                  'rotation': self.rotation,
+                  'flying': self.flying}
+        self.scene_manager.save.save_world(self.model, player, self.play_time, thumbnail)
+        self.autosave_time = 0
+        self.save_requested = False
+
+    def restore_player(self, player):
+        """ Put the player back where it was when the world was saved.
+
+        Parameters
+        ----------
+        player : dict
+            The state of the player, as saved by `save_world`.
+
+        """
+        self.position = tuple(player['position'])
+        self.rotation = tuple(player['rotation'])
+        self.flying = player['flying']
+        # Bring the chunks under the player into memory right away, rather
+        # than letting the player fall through them until they are streamed.
+        x, _, z = sectorize(self.position)
+        self.model.load_chunks([(x + dx, 0, z + dz) for dx in (-1, 0, 1) for dz in (-1, 0, 1)])
+
     def get_sight_vector(self):
         """ Returns the current line of sight vector indicating the direction
         the player is looking.
@@ -302,6 +395,21 @@ class GameScene(Scene):
         dz = math.sin(math.radians(x - 90)) * m
         return dx, dy, dz
 
+    def get_focused_block(self):
+        """ Returns the block in the line of sight of the player, and the
+        block previously in the line of sight, see `Model.hit_test`.
+
+        The result is kept until the player moves or turns, or the world
+        changes, so that a still player costs no search.
+
+        """
+        key = (tuple(round(v, 3) for v in self.position), tuple(round(v, 3) for v in self.rotation),
+               self.model.world.version)
+        if key != self._focus_key:
+            self._focus = self.model.hit_test(self.position, self.get_sight_vector())
+            self._focus_key = key
+        return self._focus
+
     def get_motion_vector(self):
         """ Returns the current motion vector indicating the velocity of the
         player.
@@ -362,23 +470,63 @@ class GameScene(Scene):
             if self.scene_manager.save.has_save_game():
                 # Returns False if unable to load the save
                 has_save = self.scene_manager.save.load_world(self.model)
+                if has_save:
+                    metadata = self.scene_manager.save.world_metadata
+                    self.play_time = metadata.get('play_time', 0)
+                    if metadata.get('player'):
+                        self.restore_player(metadata['player'])
 
             if not has_save:
-                generate_world(self.model)
-
+                # Only the chunk of the player is generated right away, the
+                # others are generated in the background around the player.
+                self.model.generator = create_generator(WORLD_GENERATOR, WORLD_SEED)
+                generate_world(self.model, self.model.generator, radius=0)
+                # Stand on the ground, whatever the height of the terrain.
+                ground = self.model.world.highest(0, 0)
+                if ground is not None:
+                    self.position = (0, max(ground + PLAYER_HEIGHT, 0), 0)
+                # Save the new world right away, so that the edit journal
+                # has a world to be replayed on. A save which failed to load
+                # is kept as it is instead.
+                if not self.scene_manager.save.load_failed:
+                    self.save_world()
+
+            self.previous_position = self.position
             self.initialized = True
 
-        self.model.process_queue()
+        self.model.insert_chunks()
+        self.renderer.process_queue()
+        self.scene_manager.save.poll()
+        self.autosave_time += dt
+        self.play_time += dt
+        # Save early when many modified chunks wait in memory to be saved.
+        save = self.scene_manager.save
+        if ((self.autosave_time >= AUTOSAVE_INTERVAL
+             or self.model.evicted_count >= MAX_EVICTED_CHUNKS // 2 and not save.saving)
+                and self.model.dirty and not save.load_failed):
+            self.save_requested = True
         sector = sectorize(self.position)
         if sector != self.sector:
-            self.model.change_sectors(self.sector, sector)
-            # if self.sector is None:
-            #     self.model.process_entire_queue()
+            self.model.change_sectors(sector, self.get_motion_vector())
+            self.renderer.change_sectors(sector, self.get_motion_vector())
             self.sector = sector
-        m = 8
-        dt = min(dt, 0.2)
-        for _ in range(m):
-            self._update(dt / m)
+        # Simulate in fixed ticks, whatever the frame rate. A long frame
+        # (e.g. while loading) only slows the game down, rather than
+        # making the player jump.
+        self.tick_time += min(dt, 0.2)
+        tick = 1.0 / TICKS_PER_SEC
+        while self.tick_time >= tick:
+            self.previous_position = self.position
+            self._update(tick)
+            self.tick_time -= tick
+
+    def get_render_position(self):
+        """ Returns the position of the camera, interpolated between the two
+        last simulation ticks.
+
+        """
+        alpha = self.tick_time * TICKS_PER_SEC
+        return tuple(a + (b - a) * alpha for a, b in zip(self.previous_position, self.position))
 
     def _update(self, dt):
         """ Private implementation of the `update()` method. This is where most
@@ -387,7 +535,7 @@ class GameScene(Scene):
         Parameters
         ----------
         dt : float
-            The change in time since the last call.
+            The duration of a simulation tick.
 
         """
         # walking
@@ -405,20 +553,21 @@ class GameScene(Scene):
             self.dy = max(self.dy, -TERMINAL_VELOCITY)
             dy += self.dy * dt
         # collisions
-        x, y, z = self.position
-        x, y, z = self.collide((x + dx, y + dy, z + dz), PLAYER_HEIGHT)
+        x, y, z = self.collide(self.position, (dx, dy, dz), PLAYER_HEIGHT)
         # fix bug for jumping outside the wall and falling to infinity.
         y = max(-1.25, y)
         self.position = (x, y, z)
 
-    def collide(self, position, height):
-        """ Checks to see if the player at the given `position` and `height`
-        is colliding with any blocks in the world.
+    def collide(self, position, motion, height):
+        """ Moves the player from `position` by `motion`, stopping it at the
+        blocks of the world it runs into.
 
         Parameters
         ----------
         position : tuple of len 3
-            The (x, y, z) position to check for collisions at.
+            The (x, y, z) position of the player before moving.
+        motion : tuple of len 3
+            The (dx, dy, dz) motion of the player.
         height : int or float
             The height of the player.
 
@@ -428,34 +577,13 @@ class GameScene(Scene):
             The new position of the player taking into account collisions.
 
         """
-        # How much overlap with a dimension of a surrounding block you need to
-        # have to count as a collision. If 0, touching terrain at all counts as
-        # a collision. If .49, you sink into the ground, as if walking through
-        # tall DIRT_WITH_GRASS. If >= .5, you'll fall through the ground.
-        pad = 0.25
-        p = list(position)
-        np = normalize(position)
-        for face in FACES:  # check all surrounding blocks
-            for i in range(3):  # check each dimension independently
-                if not face[i]:
-                    continue
-                # How much overlap you have with this dimension.
-                d = (p[i] - np[i]) * face[i]
-                if d < pad:
-                    continue
-                for dy in range(height):  # check each height
-                    op = list(np)
-                    op[1] -= dy
-                    op[i] += face[i]
-                    if tuple(op) not in self.model.world:
-                        continue
-                    p[i] -= (d - pad) * face[i]
-                    if face == (0, -1, 0) or face == (0, 1, 0):
-                        # You are colliding with the ground or ceiling, so stop
-                        # falling / rising.
-                        self.dy = 0
-                    break
-        return tuple(p)
+        low, high = player_box(position, height)
+        motion, blocked = sweep(self.model.world, low, high, motion)
+        if blocked[1]:
+            # You are colliding with the ground or ceiling, so stop
+            # falling / rising.
+            self.dy = 0
+        return tuple(p + d for p, d in zip(position, motion))
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Event handler for the Window.on_mouse_press event.
@@ -477,16 +605,17 @@ class GameScene(Scene):
 
         """
         if self.exclusive:
-            vector = self.get_sight_vector()
-            block, previous = self.model.hit_test(self.position, vector)
+            block, previous = self.get_focused_block()
             if button == mouse.RIGHT or (button == mouse.LEFT and modifiers & key.MOD_CTRL):
                 # ON OSX, control + left click = right click.
-                if previous:
-                    self.model.add_block(previous, self.block)
+                # Blocks above or below the world are not added, nor recorded.
+                if previous and self.model.add_block(previous, self.block):
+                    self.scene_manager.save.record_edit(previous, self.block)
             elif button == pyglet.window.mouse.LEFT and block:
                 texture = self.model.world[block]
-                if texture != BEDSTONE:
+                if texture.breakable:
                     self.model.remove_block(block)
+                    self.scene_manager.save.record_edit(block, None)
                     self.audio.play(self.destroy_sfx)
         else:
             self.set_exclusive_mouse(True)
@@ -562,7 +691,11 @@ class GameScene(Scene):
         elif symbol == key.F3:
             self.toggleLabel = not self.toggleLabel
         elif symbol == key.F5:
-            self.scene_manager.save.save_world(self.model)
+            self.save_requested = True
+        elif symbol == key.F7:
+            self.renderer.set_render_distance(self.renderer.render_distance - 1)
+        elif symbol == key.F8:
+            self.renderer.set_render_distance(self.renderer.render_distance + 1)
         elif symbol == key.F12:
             pyglet.image.get_buffer_manager().get_color_buffer().save('screenshot.png')
         elif symbol in self.num_keys:
@@ -611,6 +744,13 @@ class GameScene(Scene):
         n = 10
         self.reticle.vertices[:] = (x - n, y, x + n, y, x, y - n, x, y + n)
 
+    def close(self):
+        """Stop the workers of the world and of its rendering, and close its
+        region file. The saves are completed first by the SceneManager.
+        """
+        self.renderer.close()
+        self.model.close()
+
     def on_draw(self):
         """Event handler for the Window.on_draw event.
 
@@ -618,9 +758,15 @@ class GameScene(Scene):
         """
         self.window.clear()
         # Set the current position/rotation before drawing
-        self.block_group.position = self.position
+        position = self.get_render_position()
+        self.block_group.position = position
         self.block_group.rotation = self.rotation
-        # Draw everything in the batch
+        # Draw the sectors in the field of view, then everything in the batch
+        width, height = self.window.get_framebuffer_size()
+        self.renderer.draw(position, self.rotation, width / float(height))
+        if self.save_requested:
+            # Picture the world before the HUD is drawn over it.
+            self.save_world(capture_thumbnail(THUMBNAIL_WIDTH))
         self.batch.draw()
 
         # Optionally draw some things
@@ -634,8 +780,10 @@ class GameScene(Scene):
         crosshairs.
 
         """
-        vector = self.get_sight_vector()
-        block = self.model.hit_test(self.position, vector)[0]
+        block = self.get_focused_block()[0]
+        if block == self.highlighted:
+            return
+        self.highlighted = block
         if block:
             x, y, z = block
             self.highlight.vertices[:] = cube_vertices(x, y, z, 0.51)
@@ -648,277 +796,17 @@ class GameScene(Scene):
 
         """
         x, y, z = self.position
-        self.info_label.text = 'FPS = [%02d] : COORDS = [%.2f, %.2f, %.2f] : %d / %d' % (
+        queue = self.renderer.queue
+        self.info_label.text = 'FPS = [%02d] : COORDS = [%.2f, %.2f, %.2f] : %d / %d : QUEUE = %d (%d ms)' % (
             pyglet.clock.get_fps(), x, y, z,
-            self.model.currently_shown, len(self.model.world))
+            self.renderer.currently_shown, len(self.model.world),
+            len(queue), queue.latency * 1000)
+        save = self.scene_manager.save
+        if save.progress is not None:
+            self.info_label.text += ' : SAVING %d%%' % (save.progress * 100)
         self.info_label.draw()
 
 
-class Model(object):
-    def __init__(self, batch, group):
-        self.batch = batch
-
-        self.group = group
-
-        # A mapping from position to the texture of the block at that position.
-        # This defines all the blocks that are currently in the world.
-        self.world = {}
-
-        # Same mapping as `world` but only contains blocks that are shown.
-        self.shown = {}
-
-        # Mapping from position to a pyglet `VertextList` for all shown blocks.
-        self._shown = {}
-
-        # Mapping from sector to a list of positions inside that sector.
-        self.sectors = {}
-
-        #self.generate_world = generate_world(self) 
-        
-        # Simple function queue implementation. The queue is populated with
-        # _show_block() and _hide_block() calls
-        self.queue = deque()
-
-    @property
-    def currently_shown(self):
-        return len(self._shown)
-
-    def hit_test(self, position, vector, max_distance=NODE_SELECTOR):
-        """ Line of sight search from current position. If a block is
-        intersected it is returned, along with the block previously in the line
-        of sight. If no block is found, return None, None.
-
-        Parameters
-        ----------
-        position : tuple of len 3
-            The (x, y, z) position to check visibility from.
-        vector : tuple of len 3
-            The line of sight vector.
-        max_distance : int
-            How many blocks away to search for a hit.
-
-        """
-        m = 8
-        x, y, z = position
-        dx, dy, dz = vector
-        previous = None
-        for _ in range(max_distance * m):
-            checked_position = normalize((x, y, z))
-            if checked_position != previous and checked_position in self.world:
-                return checked_position, previous
-            previous = checked_position
-            x, y, z = x + dx / m, y + dy / m, z + dz / m
-        return None, None
-
-    def exposed(self, position):
-        """ Returns False if given `position` is surrounded on all 6 sides by
-        blocks, True otherwise.
-
-        """
-        x, y, z = position
-        for dx, dy, dz in FACES:
-            if (x + dx, y + dy, z + dz) not in self.world:
-                return True
-        return False
-
-    def add_block(self, position, block, immediate=True):
-        """ Add a block with the given `texture` and `position` to the world.
-
-        Parameters
-        ----------
-        position : tuple of len 3
-            The (x, y, z) position of the block to add.
-        block : Block object
-            An instance of the Block class.
-        immediate : bool
-            Whether or not to draw the block immediately.
-
-        """
-        if position in self.world:
-            self.remove_block(position, immediate)
-        self.world[position] = block
-        self.sectors.setdefault(sectorize(position), []).append(position)
-        if immediate:
-            if self.exposed(position):
-                self.show_block(position)
-            self.check_neighbors(position)
-
-    def remove_block(self, position, immediate=True):
-        """ Remove the block at the given `position`.
-
-        Parameters
-        ----------
-        position : tuple of len 3
-            The (x, y, z) position of the block to remove.
-        immediate : bool
-            Whether or not to immediately remove block from canvas.
-
-        """
-        del self.world[position]
-        self.sectors[sectorize(position)].remove(position)
-        if immediate:
-            if position in self.shown:
-                self.hide_block(position)
-            self.check_neighbors(position)
-
-    def check_neighbors(self, position):
-        """ Check all blocks surrounding `position` and ensure their visual
-        state is current. This means hiding blocks that are not exposed and
-        ensuring that all exposed blocks are shown. Usually used after a block
-        is added or removed.
-
-        """
-        x, y, z = position
-        for dx, dy, dz in FACES:
-            neighbor = (x + dx, y + dy, z + dz)
-            if neighbor not in self.world:
-                continue
-            if self.exposed(neighbor):
-                if neighbor not in self.shown:
-                    self.show_block(neighbor)
-            else:
-                if neighbor in self.shown:
-                    self.hide_block(neighbor)
-
-    def show_block(self, position, immediate=True):
-        """ Show the block at the given `position`. This method assumes the
-        block has already been added with add_block()
-
-        Parameters
-        ----------
-        position : tuple of len 3
-            The (x, y, z) position of the block to show.
-        immediate : bool
-            Whether or not to show the block immediately.
-
-        """
-        block = self.world[position]
-        self.shown[position] = block
-        if immediate:
-            self._show_block(position, block)
-        else:
-            self._enqueue(self._show_block, position, block)
-
-    def _show_block(self, position, block):
-        """ Private implementation of the `show_block()` method.
-
-        Parameters
-        ----------
-        position : tuple of len 3
-            The (x, y, z) position of the block to show.
-        block : Block instance
-            An instance of the Block class
-
-        """
-        x, y, z = position
-        vertex_data = cube_vertices(x, y, z, 0.5)
-        # create vertex list
-        # FIXME Maybe `add_indexed()` should be used instead
-        self._shown[position] = self.batch.add(24, GL_QUADS, self.group,
-                                               ('v3f/static', vertex_data),
-                                               ('t2f/static', block.tex_coords))
-
-    def hide_block(self, position, immediate=True):
-        """ Hide the block at the given `position`. Hiding does not remove the
-        block from the world.
-
-        Parameters
-        ----------
-        position : tuple of len 3
-            The (x, y, z) position of the block to hide.
-        immediate : bool
-            Whether or not to immediately remove the block from the canvas.
-
-        """
-        self.shown.pop(position)
-        if immediate:
-            self._hide_block(position)
-        else:
-            self._enqueue(self._hide_block, position)
-
-    def _hide_block(self, position):
-        """ Private implementation of the 'hide_block()` method.
-
-        """
-        self._shown.pop(position).delete()
-
-    def show_sector(self, sector):
-        """ Ensure all blocks in the given sector that should be shown are
-        drawn to the canvas.
-
-        """
-        for position in self.sectors.get(sector, []):
-            if position not in self.shown and self.exposed(position):
-                self.show_block(position, False)
-
-    def hide_sector(self, sector):
-        """ Ensure all blocks in the given sector that should be hidden are
-        removed from the canvas.
-
-        """
-        for position in self.sectors.get(sector, []):
-            if position in self.shown:
-                self.hide_block(position, False)
-
-    def change_sectors(self, before, after):
-        """ Move from sector `before` to sector `after`. A sector is a
-        contiguous x, y sub-region of world. Sectors are used to speed up
-        world rendering.
-
-        """
-        before_set = set()
-        after_set = set()
-        pad = 4
-        for dx in range(-pad, pad + 1):
-            for dy in [0]:  # range(-pad, pad + 1):
-                for dz in range(-pad, pad + 1):
-                    if dx ** 2 + dy ** 2 + dz ** 2 > (pad + 1) ** 2:
-                        continue
-                    if before:
-                        x, y, z = before
-                        before_set.add((x + dx, y + dy, z + dz))
-                    if after:
-                        x, y, z = after
-                        after_set.add((x + dx, y + dy, z + dz))
-        show = after_set - before_set
-        hide = before_set - after_set
-        for sector in show:
-            self.show_sector(sector)
-        for sector in hide:
-            self.hide_sector(sector)
-
-    def _enqueue(self, func, *args):
-        """ Add `func` to the internal queue.
-
-        """
-        self.queue.append((func, args))
-
-    def _dequeue(self):
-        """ Pop the top function from the internal queue and call it.
-
-        """
-        func, args = self.queue.popleft()
-        func(*args)
-
-    def process_queue(self):
-        """ Process the entire queue while taking periodic breaks. This allows
-        the game loop to run smoothly. The queue contains calls to
-        _show_block() and _hide_block() so this method should be called if
-        add_block() or remove_block() was called with immediate=False
-
-        """
-        start = time.clock()
-        while self.queue and time.clock() - start < 1.0 / TICKS_PER_SEC:
-            self._dequeue()
-
-    def process_entire_queue(self):
-        """ Process the entire queue with no breaks.
-
-        """
-        while self.queue:
-            self._dequeue()
-
-
 class HelpScene(Scene):
     def __init__(self, window):
         self.window = window
@@ -930,7 +818,8 @@ class HelpScene(Scene):
                              "* Right click mouse to create block",
                              "* Press keys 1 through 0 to choose block type",
                              "* Press F2 key to hide block selection",
-                             "* Press F3 key to hide debug stats"]
+                             "* Press F3 key to hide debug stats",
+                             "* Press F7 / F8 keys to change the render distance"]
 
         self.return_label = pyglet.text.Label("Press any key to return to game", font_size=25,
                                               x=self.window.width // 2, y=20, anchor_x='center',
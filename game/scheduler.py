@@ -0,0 +1,134 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import itertools
+import time
+
+
+class WorkQueue:
+    """A queue of deferred operations on sectors, run nearest first.
+
+    Each operation targets a sector, and is prioritized by the distance of
+    that sector to a center (the sector the player is in). At most one
+    operation is pending per sector: pushing a new one cancels the previous
+    one, so that e.g. a show followed by a hide of the same sector only runs
+    the hide.
+
+    The queue also counts the operations, and measures the time they wait
+    before being run.
+    """
+
+    def __init__(self):
+        # Heap of [priority, order, sector, func, args, push time] entries.
+        # Cancelled entries stay in the heap with a func of None.
+        self._heap = []
+        # Mapping from sector to its pending heap entry.
+        self._pending = {}
+        self._order = itertools.count()
+        self.center = (0, 0, 0)
+
+        # Counters
+        self.pushed = 0
+        self.executed = 0
+        self.cancelled = 0
+        self.latency = 0.0       # Average wait of the last operations, in seconds.
+        self.max_latency = 0.0   # Longest wait since the last `reset_stats()`.
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _priority(self, sector):
+        x, _, z = self.center
+        sx, _, sz = sector
+        return (sx - x) ** 2 + (sz - z) ** 2
+
+    def push(self, sector, func, *args):
+        """Add the operation `func(*args)` on `sector` to the queue,
+        cancelling any operation pending on the same sector.
+        """
+        self.cancel(sector)
+        entry = [self._priority(sector), next(self._order), sector, func, args, time.perf_counter()]
+        self._pending[sector] = entry
+        heapq.heappush(self._heap, entry)
+        self.pushed += 1
+
+    def cancel(self, sector):
+        """Cancel the operation pending on `sector`, if any."""
+        entry = self._pending.pop(sector, None)
+        if entry is not None:
+            entry[3] = None
+            self.cancelled += 1
+
+    def set_center(self, center):
+        """Change the sector the priorities are computed from."""
+        if center == self.center:
+            return
+        self.center = center
+        self._heap = [entry for entry in self._heap if entry[3] is not None]
+        for entry in self._heap:
+            entry[0] = self._priority(entry[2])
+        heapq.heapify(self._heap)
+
+    def pop(self):
+        """Remove the nearest pending operation and return it as a
+        (func, args) tuple. Raises IndexError if the queue is empty.
+        """
+        while True:
+            _, _, sector, func, args, pushed = heapq.heappop(self._heap)
+            if func is not None:
+                break
+        del self._pending[sector]
+        wait = time.perf_counter() - pushed
+        self.latency += (wait - self.latency) * 0.05
+        self.max_latency = max(self.max_latency, wait)
+        self.executed += 1
+        return func, args
+
+    def run(self, budget=None):
+        """Run the pending operations, nearest first.
+
+        :param budget: Stop after this many seconds, or run all the
+                       operations if None.
+        """
+        start = time.perf_counter()
+        while self._pending:
+            if budget is not None and time.perf_counter() - start >= budget:
+                break
+            func, args = self.pop()
+            func(*args)
+
+    def reset_stats(self):
+        """Reset the counters."""
+        self.pushed = self.executed = self.cancelled = 0
+        self.latency = self.max_latency = 0.0
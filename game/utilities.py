@@ -31,6 +31,9 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import os
+import sys
+
 from .config import *
 
 
@@ -68,3 +71,37 @@ def sectorize(position):
     """
     x, y, z = normalize(position)
     return x//SECTOR_SIZE, 0, z//SECTOR_SIZE
+
+
+def ring_offsets(radius):
+    """Return the offsets of the sectors within `radius` sectors of a
+    center sector, sorted from the nearest to the furthest.
+
+    :param radius: int: The number of sectors around the center.
+    :return: list of (dx, 0, dz) tuples
+    """
+    offsets = [(dx, 0, dz) for dx in range(-radius, radius + 1)
+               for dz in range(-radius, radius + 1)
+               if dx ** 2 + dz ** 2 <= (radius + 1) ** 2]
+    return sorted(offsets, key=lambda offset: offset[0] ** 2 + offset[2] ** 2)
+
+
+def get_settings_path(name):
+    """Return the directory where to save the settings and the saved games,
+    following the conventions of each platform (the same directory as
+    `pyglet.resource.get_settings_path`). The directory may not exist.
+
+    :param name: str: The name of the application.
+    :return: str
+    """
+    if sys.platform in ('cygwin', 'win32'):
+        if 'APPDATA' in os.environ:
+            return os.path.join(os.environ['APPDATA'], name)
+        return os.path.expanduser('~/%s' % name)
+    elif sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Application Support/%s' % name)
+    elif sys.platform.startswith('linux'):
+        if 'XDG_CONFIG_HOME' in os.environ:
+            return os.path.join(os.environ['XDG_CONFIG_HOME'], name)
+        return os.path.expanduser('~/.config/%s' % name)
+    return os.path.expanduser('~/.%s' % name)
@@ -0,0 +1,420 @@
+#!/bin/python3
+
+"""
+ ________                                        ______                       ______     __
+|        \                                      /      \                     /      \   |  \ 
+ \$$$$$$$$______    ______    ______   ______  |  $$$$$$\  ______   ______  |  $$$$$$\ _| $$_
+   | $$  /      \  /      \  /      \ |      \ | $$   \$$ /      \ |      \ | $$_  \$$|   $$ \ 
+   | $$ |  $$$$$$\|  $$$$$$\|  $$$$$$\ \$$$$$$\| $$      |  $$$$$$\ \$$$$$$\| $$ \     \$$$$$$
+   | $$ | $$    $$| $$   \$$| $$   \$$/      $$| $$   __ | $$   \$$/      $$| $$$$      | $$ __
+   | $$ | $$$$$$$$| $$      | $$     |  $$$$$$$| $$__/  \| $$     |  $$$$$$$| $$        | $$|  \ 
+   | $$  \$$     \| $$      | $$      \$$    $$ \$$    $$| $$      \$$    $$| $$         \$$  $$
+    \$$   \$$$$$$$ \$$       \$$       \$$$$$$$  \$$$$$$  \$$       \$$$$$$$ \$$          \$$$$
+
+
+Copyright (C) 2013 Michael Fogleman
+Copyright (C) 2018/2019 Stefano Peris <xenonlab.develop@gmail.com>
+
+Github repository: <https://github.com/XenonLab-Studio/TerraCraft>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import zlib
+
+import numpy
+
+from .blocks import BLOCKS
+from .config import *
+
+
+class Chunk:
+    """A column of SECTOR_SIZE x WORLD_HEIGHT x SECTOR_SIZE blocks.
+
+    Blocks are stored in a dense array of small integers, indexed by the
+    local (x, y, z) position inside the column. Each integer is an index in
+    the `palette`, which holds the Block instances used by this chunk.
+    Index 0 is reserved for air (no block).
+    """
+    __slots__ = ('blocks', 'palette', 'count')
+
+    def __init__(self):
+        self.blocks = numpy.zeros((SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE), dtype=numpy.uint8)
+        self.palette = [None]
+        self.count = 0
+
+    def palette_index(self, block):
+        """Return the palette index of `block`, adding it if needed."""
+        for index, item in enumerate(self.palette):
+            if item is block:
+                return index
+        self.palette.append(block)
+        index = len(self.palette) - 1
+        if index > numpy.iinfo(self.blocks.dtype).max:
+            # More materials than fit in a byte, widen the storage.
+            self.blocks = self.blocks.astype(numpy.uint16)
+        return index
+
+    def lookup(self):
+        """Return an array mapping the palette indices to the numeric block
+        ids (see `blocks.BLOCKS`).
+        """
+        dtype = numpy.uint8 if len(BLOCKS) <= 256 else numpy.uint16
+        return numpy.array([0] + [block.id for block in self.palette[1:]], dtype=dtype)
+
+    def ids(self):
+        """Return an array of the numeric block ids (see `blocks.BLOCKS`)
+        stored in this chunk, with the same shape as `blocks`.
+        """
+        return self.lookup()[self.blocks]
+
+    def snapshot(self):
+        """Return a `ChunkSnapshot` of the current blocks of this chunk."""
+        return ChunkSnapshot(self.blocks.copy(), self.lookup())
+
+    def get(self, index):
+        """Return the Block at the local `index`, or None."""
+        return self.palette[self.blocks[index]]
+
+    def set(self, index, block):
+        """Store `block` at the local `index`. A `block` of None clears it.
+
+        :return: The Block which was previously stored there, or None.
+        """
+        previous = self.palette[self.blocks[index]]
+        if block is None:
+            self.blocks[index] = 0
+        else:
+            self.blocks[index] = self.palette_index(block)
+        self.count += (block is not None) - (previous is not None)
+        return previous
+
+
+class ChunkSnapshot:
+    """A copy of the blocks of a `Chunk` at some point in time.
+
+    Taking it only copies the palette indices, which is much cheaper than
+    building the block ids: this is left to `ids`, which can be called
+    later, from another thread.
+    """
+    __slots__ = ('blocks', 'lookup')
+
+    def __init__(self, blocks, lookup):
+        self.blocks = blocks
+        self.lookup = lookup
+
+    def ids(self):
+        """Return the block ids of the chunk, see `Chunk.ids`."""
+        return self.lookup[self.blocks]
+
+
+class ChunkStore:
+    """Mapping from (x, y, z) block positions to Block instances.
+
+    Blocks are stored by chunks: one `Chunk` per sector, as returned by
+    `utilities.sectorize`. It offers the dict-like interface the rest of the
+    game expects (`in`, `[]`, `del`, `len`, `items`...) while using about a
+    byte per block instead of a tuple key and a dict entry.
+    """
+
+    def __init__(self):
+        # Mapping from sector to the `Chunk` holding its blocks.
+        self.chunks = {}
+
+        # Total number of blocks, kept up to date so `len` is cheap.
+        self._count = 0
+
+        # Incremented on every change of the blocks, so that results computed
+        # from them can be cached until the next change.
+        self.version = 0
+
+    @staticmethod
+    def locate(position):
+        """Return the sector and the local index of a block `position`.
+
+        The local index is None if the position is above or below the world.
+        """
+        x, y, z = position
+        sector = x // SECTOR_SIZE, 0, z // SECTOR_SIZE
+        y -= WORLD_BOTTOM
+        if not 0 <= y < WORLD_HEIGHT:
+            return sector, None
+        return sector, (x % SECTOR_SIZE, y, z % SECTOR_SIZE)
+
+    @staticmethod
+    def in_bounds(position):
+        """Returns True if a block can be stored at `position`."""
+        return 0 <= position[1] - WORLD_BOTTOM < WORLD_HEIGHT
+
+    def __contains__(self, position):
+        sector, index = self.locate(position)
+        chunk = self.chunks.get(sector)
+        if chunk is None or index is None:
+            return False
+        return chunk.blocks[index] != 0
+
+    def __getitem__(self, position):
+        block = self.get(position)
+        if block is None:
+            raise KeyError(position)
+        return block
+
+    def get(self, position, default=None):
+        sector, index = self.locate(position)
+        chunk = self.chunks.get(sector)
+        if chunk is None or index is None:
+            return default
+        block = chunk.get(index)
+        return default if block is None else block
+
+    def __setitem__(self, position, block):
+        sector, index = self.locate(position)
+        if index is None:
+            raise KeyError('Position out of the world: {}'.format(position))
+        chunk = self.chunks.get(sector)
+        if chunk is None:
+            chunk = self.chunks[sector] = Chunk()
+        previous = chunk.set(index, block)
+        self._count += previous is None
+        self.version += 1
+
+    def __delitem__(self, position):
+        sector, index = self.locate(position)
+        chunk = self.chunks.get(sector)
+        if chunk is None or index is None or chunk.blocks[index] == 0:
+            raise KeyError(position)
+        chunk.set(index, None)
+        self._count -= 1
+        self.version += 1
+        if chunk.count == 0:
+            del self.chunks[sector]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for sector in list(self.chunks):
+            yield from self.positions(sector)
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for sector, chunk in list(self.chunks.items()):
+            for position in self.positions(sector):
+                yield position, self[position]
+
+    def highest(self, x, z):
+        """Return the y position of the highest block of the column (x, z),
+        or None if the column is empty.
+        """
+        sector, index = self.locate((x, WORLD_BOTTOM, z))
+        chunk = self.chunks.get(sector)
+        if chunk is None:
+            return None
+        filled = numpy.flatnonzero(chunk.blocks[index[0], :, index[2]])
+        if len(filled) == 0:
+            return None
+        return WORLD_BOTTOM + int(filled[-1])
+
+    def positions(self, sector):
+        """Return a list of the positions of all blocks in `sector`."""
+        positions, _ = self.arrays(sector)
+        return list(map(tuple, positions.tolist()))
+
+    def arrays(self, sector):
+        """Return the blocks of `sector` as arrays.
+
+        :return: A tuple (positions, ids) of an int array of shape (n, 3) and
+                 of an array of shape (n,) of the block ids (see `blocks.BLOCKS`).
+        """
+        chunk = self.chunks.get(sector)
+        if chunk is None:
+            return numpy.zeros((0, 3), dtype=int), numpy.zeros(0, dtype=numpy.uint8)
+        indices = numpy.nonzero(chunk.blocks)
+        ids = chunk.ids()[indices]
+        positions = numpy.stack(indices, axis=-1) + self.origin(sector)
+        return positions, ids
+
+    @staticmethod
+    def origin(sector):
+        """Return the position of the block at the local index (0, 0, 0) of
+        the chunk of `sector`.
+        """
+        sx, _, sz = sector
+        return numpy.array((sx * SECTOR_SIZE, WORLD_BOTTOM, sz * SECTOR_SIZE))
+
+    def set_many(self, positions, ids):
+        """Store many blocks at once.
+
+        :param positions: Int array of shape (n, 3) of the block positions.
+                          Positions above or below the world are ignored.
+        :param ids: Array of shape (n,) of the block ids to store, 0 removes
+                    the block. When a position is repeated, the last id wins.
+        :return: The set of sectors which have been modified.
+        """
+        positions = numpy.asarray(positions, dtype=int).reshape(-1, 3)
+        ids = numpy.asarray(ids, dtype=int).reshape(-1)
+        inside = (positions[:, 1] >= WORLD_BOTTOM) & (positions[:, 1] < WORLD_BOTTOM + WORLD_HEIGHT)
+        positions = positions[inside]
+        ids = ids[inside]
+        if len(positions) == 0:
+            return set()
+        x, y, z = positions.T
+        sx = x // SECTOR_SIZE
+        sz = z // SECTOR_SIZE
+        # Give each block a single integer key, sorting them by sector:
+        sx_min, sz_min = sx.min(), sz.min()
+        sector_keys = (sx - sx_min) * (sz.max() - sz_min + 1) + (sz - sz_min)
+        size = SECTOR_SIZE * WORLD_HEIGHT * SECTOR_SIZE
+        local = ((x - sx * SECTOR_SIZE) * WORLD_HEIGHT + y - WORLD_BOTTOM) * SECTOR_SIZE + z - sz * SECTOR_SIZE
+        keys = sector_keys * size + local
+        # Keep only the last occurrence of each position:
+        keys, last = numpy.unique(keys[::-1], return_index=True)
+        keep = len(positions) - 1 - last
+        ids = ids[keep]
+        sx = sx[keep]
+        sz = sz[keep]
+        local = local[keep]
+        # Then store the blocks of each sector at once:
+        bounds = numpy.flatnonzero(numpy.diff(keys // size)) + 1
+        modified = set()
+        for begin, end in zip([0] + bounds.tolist(), bounds.tolist() + [len(keys)]):
+            sector = int(sx[begin]), 0, int(sz[begin])
+            index = numpy.unravel_index(local[begin:end], (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE))
+            self._fill_chunk(sector, index, ids[begin:end])
+            modified.add(sector)
+        return modified
+
+    def fill(self, start, end, block_id):
+        """Fill a box with a single block.
+
+        :param start: The (x, y, z) position of a corner of the box.
+        :param end: The (x, y, z) position of the opposite corner, included.
+        :param block_id: The id of the block to store, 0 removes the blocks.
+        :return: The set of sectors which have been modified.
+        """
+        low = numpy.minimum(start, end)
+        high = numpy.maximum(start, end) + 1
+        low[1] = max(low[1], WORLD_BOTTOM)
+        high[1] = min(high[1], WORLD_BOTTOM + WORLD_HEIGHT)
+        if low[1] >= high[1]:
+            return set()
+        modified = set()
+        for sx in range(low[0] // SECTOR_SIZE, (high[0] - 1) // SECTOR_SIZE + 1):
+            for sz in range(low[2] // SECTOR_SIZE, (high[2] - 1) // SECTOR_SIZE + 1):
+                sector = sx, 0, sz
+                local_low = numpy.maximum(low - self.origin(sector), 0)
+                local_high = numpy.minimum(high - self.origin(sector), (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE))
+                local = tuple(slice(a, b) for a, b in zip(local_low, local_high))
+                self._fill_chunk(sector, local, block_id)
+                modified.add(sector)
+        return modified
+
+    def set_chunk(self, sector, ids):
+        """Replace all the blocks of a chunk.
+
+        :param sector: The sector of the chunk.
+        :param ids: Array of block ids of shape (SECTOR_SIZE, WORLD_HEIGHT,
+                    SECTOR_SIZE), indexed by the position relative to
+                    `origin(sector)`.
+        :return: The set of sectors which have been modified.
+        """
+        sector = sector[0], 0, sector[2]
+        old = self.chunks.pop(sector, None)
+        if old is not None:
+            self._count -= old.count
+            self.version += 1
+        self._fill_chunk(sector, Ellipsis, numpy.asarray(ids))
+        return {sector}
+
+    def chunk_ids(self, sector):
+        """Return the block ids of a whole chunk, as an array of shape
+        (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE), or None if it is empty.
+        """
+        chunk = self.chunks.get(sector)
+        if chunk is None:
+            return None
+        return chunk.ids()
+
+    def snapshot(self, sector):
+        """Return a `ChunkSnapshot` of the chunk of `sector`."""
+        chunk = self.chunks.get(sector)
+        if chunk is None:
+            chunk = Chunk()
+        return chunk.snapshot()
+
+    def pop_chunk(self, sector):
+        """Remove a whole chunk from the store.
+
+        :return: The block ids of the chunk (see `chunk_ids`), or None if it
+                 was empty.
+        """
+        chunk = self.chunks.pop(sector, None)
+        if chunk is None:
+            return None
+        self._count -= chunk.count
+        self.version += 1
+        return chunk.ids()
+
+    def _fill_chunk(self, sector, index, ids):
+        """Store block ids in the chunk of `sector`, at `index` (anything
+        accepted by NumPy as an index), and keep the counts up to date.
+        """
+        chunk = self.chunks.get(sector)
+        if chunk is None:
+            if not numpy.any(ids):
+                return
+            chunk = self.chunks[sector] = Chunk()
+        self.version += 1
+        lookup = numpy.zeros(len(BLOCKS), dtype=chunk.blocks.dtype)
+        for block_id in numpy.unique(ids).tolist():
+            if block_id:
+                lookup[block_id] = chunk.palette_index(BLOCKS[block_id])
+        # The chunk storage may have been widened while adding to the palette:
+        chunk.blocks[index] = lookup.astype(chunk.blocks.dtype)[ids]
+        count = int(numpy.count_nonzero(chunk.blocks))
+        self._count += count - chunk.count
+        chunk.count = count
+        if count == 0:
+            del self.chunks[sector]
+
+
+def compress_chunk(ids):
+    """Return the block ids of a chunk as compressed bytes.
+
+    :param ids: Array of shape (SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE),
+                as returned by `ChunkStore.chunk_ids`, or None.
+    """
+    if ids is None:
+        ids = numpy.zeros((SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE), dtype=numpy.uint8)
+    return ids.dtype.char.encode() + zlib.compress(ids.tobytes())
+
+
+def decompress_chunk(data):
+    """Return the block ids of a chunk compressed by `compress_chunk`.
+
+    :raise ValueError: If the data is not a valid chunk, or holds ids of
+                       unknown blocks.
+    """
+    try:
+        dtype = numpy.dtype(data[:1].decode())
+        ids = numpy.frombuffer(zlib.decompress(data[1:]), dtype=dtype)
+    except (TypeError, UnicodeDecodeError, zlib.error) as error:
+        raise ValueError("Invalid chunk data: {}".format(error))
+    if dtype.kind != 'u' or ids.size != SECTOR_SIZE * WORLD_HEIGHT * SECTOR_SIZE:
+        raise ValueError("Invalid chunk data")
+    if ids.size and int(ids.max()) >= len(BLOCKS):
+        raise ValueError("Unknown block id in chunk: {}".format(ids.max()))
+    return ids.reshape((SECTOR_SIZE, WORLD_HEIGHT, SECTOR_SIZE))
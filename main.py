@@ -32,13 +32,19 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import pyglet
-
-from game.graphics import *
-from game.scenemanager import SceneManager
+from game.config import *
 
 
 def main():
+    # The game is imported here rather than at the top: the processes
+    # generating the chunks (see `game.model.Model`) import this module too,
+    # and must not load pyglet nor open an OpenGL context.
+    import pyglet
+
+    from pyglet.gl import Config
+    from game.graphics import setup_opengl
+    from game.scenemanager import SceneManager
+
     # The pyglet.resource module handles efficient loading of assets:
     pyglet.resource.path = ['assets', 'assets/images', 'assets/sounds']
     pyglet.resource.reindex()
@@ -51,7 +57,7 @@ def main():
 
     # Create an instance of the SceneManager, and schedule it to update:
     scene_manager = SceneManager(window=window)
-    pyglet.clock.schedule_interval(scene_manager.update, 1.0 / TICKS_PER_SEC)
+    pyglet.clock.schedule_interval(scene_manager.update, 1.0 / FRAMES_PER_SEC)
 
     # Setup some OpenGL settings (from game.graphics), and start the game loop:
     setup_opengl()
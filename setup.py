@@ -38,6 +38,7 @@ setup(
     name='TerraCraft',
     version='0.2.1',
     packages=['pyglet'],  # external packages as dependencies
+    install_requires=['pyglet', 'numpy'],
     url='https://github.com/XenonLab-Studio/TerraCraft',
     license='GPL 3.0',
     author='Stefano Peris a.k.a. <XenonCoder>',